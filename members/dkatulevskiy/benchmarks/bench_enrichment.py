@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare one-repository-per-call enrichment with batched prompts.
+
+Runs create_portfolio against a local stand-in chat server for each batch size
+and reports wall time, request count and prompt tokens per project.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import portfolio
+from fake_servers import FakeChatServer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark batched LLM enrichment against a local stand-in server"
+    )
+    parser.add_argument(
+        "--repos", type=int, default=32, help="Number of synthetic repositories"
+    )
+    parser.add_argument(
+        "--batch_sizes",
+        type=str,
+        default="1,2,4,8",
+        help="Comma-separated batch sizes to compare",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent LLM requests"
+    )
+    parser.add_argument(
+        "--prefill_ms",
+        type=float,
+        default=0.2,
+        help="Simulated prefill milliseconds per prompt token",
+    )
+    parser.add_argument(
+        "--decode_ms",
+        type=float,
+        default=2.0,
+        help="Simulated decode milliseconds per generated token",
+    )
+    return parser.parse_args()
+
+
+def synthetic_repositories(count):
+    """Build repository information dicts shaped like get_user_repositories output"""
+    return [
+        {
+            "name": f"project-{i}",
+            "full_name": f"bench/project-{i}",
+            "description": f"Benchmark repository number {i}",
+            "language": "Python",
+            "url": f"https://github.com/bench/project-{i}",
+            "commit_count": 1000 - i,
+            "contributors": 1 + i % 5,
+            "license": "MIT",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    args = parse_args()
+    repositories = synthetic_repositories(args.repos)
+
+    with FakeChatServer(
+        prefill_ms_per_token=args.prefill_ms,
+        decode_ms_per_token=args.decode_ms,
+        slots=args.concurrency,
+    ) as server:
+        portfolio.API_ENDPOINT = server.url
+        portfolio.init_llm_cache(enabled=False)
+        portfolio.init_llm_session(pool_size=args.concurrency)
+
+        results = []
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            server.reset_stats()
+            start = time.perf_counter()
+            projects = portfolio.create_portfolio(
+                repositories, concurrency=args.concurrency, batch_size=batch_size
+            )
+            elapsed = time.perf_counter() - start
+            results.append(
+                (
+                    batch_size,
+                    elapsed,
+                    server.requests,
+                    server.prompt_tokens / len(projects),
+                    len(projects) / elapsed * 60,
+                )
+            )
+
+    print(
+        f"\n{'batch':>5} {'wall s':>8} {'requests':>8} {'prompt tok/proj':>15} {'proj/min':>9}"
+    )
+    for batch_size, elapsed, requests_made, prompt_tokens, throughput in results:
+        print(
+            f"{batch_size:>5} {elapsed:>8.2f} {requests_made:>8} "
+            f"{prompt_tokens:>15.0f} {throughput:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for generate_portfolio_images.py.
+
+Renders the same projects with different numbers of worker processes into a
+temporary directory and reports images per minute for each worker count.
+Wall time includes each worker loading its own pipeline. With --tiny it uses a
+tiny randomly initialized pipeline, so it runs offline on a CPU.
+"""
+
+import os
+import sys
+import time
+import copy
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_portfolio_images as gpi
+from run_report import start_report
+from tiny_pipeline import DEFAULT_PATH, ensure_tiny_pipeline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark multi-process image generation throughput"
+    )
+    parser.add_argument(
+        "--projects_file",
+        type=str,
+        default=os.path.join(os.path.dirname(gpi.__file__), "projects.json"),
+        help="Projects to render",
+    )
+    parser.add_argument(
+        "--count", type=int, default=8, help="Number of projects to render per run"
+    )
+    parser.add_argument(
+        "--workers_list",
+        type=str,
+        default="1,2,4",
+        help="Comma-separated worker counts to compare",
+    )
+    parser.add_argument(
+        "--generator_args",
+        type=str,
+        default="--num_inference_steps 20 --seed 0",
+        help="Extra arguments passed to the generator (e.g. --model)",
+    )
+    parser.add_argument(
+        "--tiny",
+        action="store_true",
+        help="Render with a tiny random pipeline (built on first use) instead of --model",
+    )
+    parser.add_argument(
+        "--tiny_path",
+        type=str,
+        default=DEFAULT_PATH,
+        help="Where the tiny pipeline is kept",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    projects = gpi.load_projects(args.projects_file)[: args.count]
+    cores = os.cpu_count() or 1
+    generator_args = args.generator_args.split()
+    if args.tiny:
+        generator_args += ["--model", ensure_tiny_pipeline(args.tiny_path)]
+
+    results = []
+    for workers in [int(w) for w in args.workers_list.split(",")]:
+        with tempfile.TemporaryDirectory() as output_dir:
+            pending = []
+            for i, project in enumerate(projects):
+                project = copy.deepcopy(project)
+                project["image"] = os.path.join(output_dir, f"{project['id']}-800.webp")
+                pending.append((i, project))
+
+            gen_args = gpi.parse_args(generator_args)
+            threads = max(1, cores // workers)
+            report = start_report(f"bench-images-{workers}")
+            start = time.perf_counter()
+            generated = gpi.render_sharded(pending, gen_args, workers, threads)
+            elapsed = time.perf_counter() - start
+            stages = report.summary()["stages"]
+            denoise_p50 = stages.get("denoise", {}).get("p50", 0.0)
+            encode_p50 = stages.get("encode", {}).get("p50", 0.0)
+            results.append(
+                (workers, threads, generated, elapsed, denoise_p50, encode_p50)
+            )
+
+    print(
+        f"\n{'workers':>7} {'threads':>7} {'images':>6} {'wall s':>8} {'img/min':>8} "
+        f"{'denoise p50':>11} {'encode p50':>10}"
+    )
+    for workers, threads, generated, elapsed, denoise_p50, encode_p50 in results:
+        print(
+            f"{workers:>7} {threads:>7} {generated:>6} {elapsed:>8.1f} "
+            f"{generated / elapsed * 60:>8.1f} {denoise_p50:>11.3f} {encode_p50:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for portfolio.py against local stand-in servers.
+
+For every repository count, starts a fake GitHub API and a fake chat server,
+then runs get_user_repositories -> create_portfolio -> output writing in a
+temporary directory. Reports wall time per stage, request counts and the peak
+resident set size of the process, sampled as in bench_images.py (it includes
+the in-process fake servers, so the growth over the RSS at the start of the run
+is reported as well). No credentials or network access are needed.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import portfolio
+from run_report import start_report, stage
+from fake_servers import FakeChatServer, FakeGitHubServer
+from generate_portfolio_images import PeakRSSSampler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the full portfolio build against local fake servers"
+    )
+    parser.add_argument(
+        "--repos_list",
+        type=str,
+        default="10,100,1000",
+        help="Comma-separated repository counts to benchmark",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="graphql",
+        choices=["graphql", "rest"],
+        help="Repository metadata backend (rest needs PyGithub)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent GitHub lookups"
+    )
+    parser.add_argument(
+        "--llm_concurrency", type=int, default=4, help="Concurrent LLM requests"
+    )
+    parser.add_argument(
+        "--batch_size", type=int, default=1, help="Repositories per LLM request"
+    )
+    parser.add_argument(
+        "--page_size", type=int, default=portfolio.PAGE_SIZE, help="Projects per page"
+    )
+    parser.add_argument(
+        "--github_page_size",
+        type=int,
+        default=100,
+        help="Largest page the fake GitHub API returns",
+    )
+    parser.add_argument(
+        "--github_latency_ms",
+        type=float,
+        default=20.0,
+        help="Simulated GitHub round-trip time",
+    )
+    parser.add_argument(
+        "--github_error_rate",
+        type=float,
+        default=0.0,
+        help="Fraction of GitHub requests answered with a 502",
+    )
+    parser.add_argument(
+        "--llm_latency_ms",
+        type=float,
+        default=0.0,
+        help="Simulated LLM round-trip time on top of the token costs",
+    )
+    parser.add_argument(
+        "--llm_error_rate",
+        type=float,
+        default=0.0,
+        help="Fraction of LLM requests answered with a 503",
+    )
+    parser.add_argument(
+        "--prefill_ms",
+        type=float,
+        default=0.01,
+        help="Simulated prefill milliseconds per prompt token",
+    )
+    parser.add_argument(
+        "--decode_ms",
+        type=float,
+        default=0.05,
+        help="Simulated decode milliseconds per generated token",
+    )
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=0.05,
+        help="LLM and GitHub retry backoff base in seconds (portfolio default: 1.0)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for synthetic data and failures"
+    )
+    parser.add_argument(
+        "--json", type=str, default=None, help="Also write the results to this file"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the output of portfolio.py"
+    )
+    return parser.parse_args()
+
+
+def github_actions_for(server):
+    """
+    Stand-in for actions.GitHubActions pointed at a fake server
+
+    The graphql backend only reads user.login; the rest backend lists
+    repositories with PyGithub.
+    """
+    try:
+        from github import Github
+    except ImportError:
+        return SimpleNamespace(user=SimpleNamespace(login=server.login))
+    github = Github(login_or_token="bench", base_url=server.url)
+    return SimpleNamespace(github=github, user=github.get_user())
+
+
+def run_once(args, repo_count):
+    """
+    Build a portfolio of repo_count repositories in a temporary directory
+
+    Returns:
+        dict: Timings, request counts and peak memory of the run
+    """
+    github_server = FakeGitHubServer(
+        repos=repo_count,
+        max_page_size=args.github_page_size,
+        latency_ms=args.github_latency_ms,
+        error_rate=args.github_error_rate,
+        seed=args.seed,
+    )
+    chat_server = FakeChatServer(
+        prefill_ms_per_token=args.prefill_ms,
+        decode_ms_per_token=args.decode_ms,
+        slots=args.llm_concurrency,
+        latency_ms=args.llm_latency_ms,
+        error_rate=args.llm_error_rate,
+        seed=args.seed,
+    )
+    cwd = os.getcwd()
+    quiet = (
+        contextlib.nullcontext()
+        if args.verbose
+        else contextlib.redirect_stdout(io.StringIO())
+    )
+    with tempfile.TemporaryDirectory() as workdir, github_server, chat_server:
+        os.chdir(workdir)
+        try:
+            portfolio.GITHUB_API_URL = github_server.url
+            portfolio.GITHUB_GRAPHQL_URL = github_server.graphql_url
+            portfolio.API_ENDPOINT = chat_server.url
+            portfolio.LLM_BACKOFF_BASE = args.backoff
+            portfolio.GITHUB_BACKOFF_BASE = args.backoff
+            portfolio.init_github_session(use_cache=False)
+            portfolio.init_llm_cache(enabled=False)
+            portfolio.init_llm_session(pool_size=args.llm_concurrency)
+            github_actions = github_actions_for(github_server)
+            report = start_report(f"bench-{repo_count}")
+
+            start = time.perf_counter()
+            with quiet, PeakRSSSampler() as rss:
+                with stage("github_listing"):
+                    repositories = portfolio.get_user_repositories(
+                        github_actions, workers=args.workers, backend=args.backend
+                    )
+                with stage("enrichment"):
+                    projects = portfolio.create_portfolio(
+                        repositories,
+                        concurrency=args.llm_concurrency,
+                        batch_size=args.batch_size,
+                    )
+                with stage("write_output"):
+                    portfolio.save_portfolio(projects, repositories)
+                    portfolio.write_paginated_output(projects, page_size=args.page_size)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    summary = report.summary()
+    stages = summary["stages"]
+    return {
+        "repos": repo_count,
+        "projects": len(projects),
+        "wall_seconds": elapsed,
+        "listing_seconds": stages["github_listing"]["total"],
+        "enrichment_seconds": stages["enrichment"]["total"],
+        "write_seconds": stages["write_output"]["total"],
+        "github_requests": dict(sorted(github_server.requests.items())),
+        "github_errors": github_server.errors,
+        "llm_requests": chat_server.requests,
+        "llm_errors": chat_server.errors,
+        "peak_rss_mb": rss.peak / (1024 * 1024),
+        "rss_growth_mb": (rss.peak - rss.start) / (1024 * 1024),
+        "counters": summary["counters"],
+    }
+
+
+def main():
+    args = parse_args()
+
+    results = []
+    for repo_count in [int(n) for n in args.repos_list.split(",")]:
+        print(f"Benchmarking {repo_count} repositories...")
+        result = run_once(args, repo_count)
+        if result["projects"] != repo_count:
+            print(f"  warning: built {result['projects']} of {repo_count} projects")
+        results.append(result)
+
+    print(
+        f"\n{'repos':>6} {'wall s':>8} {'list s':>8} {'enrich s':>8} {'write s':>8} "
+        f"{'gh reqs':>8} {'llm reqs':>8} {'errors':>7} {'RSS MB':>8} {'+RSS MB':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['repos']:>6} {r['wall_seconds']:>8.2f} {r['listing_seconds']:>8.2f} "
+            f"{r['enrichment_seconds']:>8.2f} {r['write_seconds']:>8.2f} "
+            f"{sum(r['github_requests'].values()):>8} {r['llm_requests']:>8} "
+            f"{r['github_errors'] + r['llm_errors']:>7} {r['peak_rss_mb']:>8.1f} "
+            f"{r['rss_growth_mb']:>8.1f}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
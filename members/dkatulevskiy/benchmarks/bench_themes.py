@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for theme extraction over large project sets.
+
+Compares the previous extract_theme_elements (random fallback words) with the
+current one (TF-IDF fallback words against the frozen theme_idf.json) on
+synthetic descriptions. Also times theme-term matching alone, once with one
+substring scan per term (what match_theme_terms does) and once with a single
+precompiled alternation regex.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_portfolio_images as gpi
+
+FILLER_WORDS = (
+    "backend service framework library toolkit pipeline dashboard scheduler "
+    "compiler parser renderer tracker manager monitor gateway adapter plugin "
+    "students course homework research benchmark simulation experiment "
+    "lightweight scalable reliable portable configurable realtime offline"
+).split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark theme extraction against the previous implementation"
+    )
+    parser.add_argument(
+        "--projects", type=int, default=5000, help="Number of synthetic projects"
+    )
+    parser.add_argument(
+        "--words", type=int, default=80, help="Words per synthetic description"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per implementation (best is kept)"
+    )
+    return parser.parse_args()
+
+
+def synthetic_projects(count, words, seed=0):
+    """Build projects with random descriptions drawn from theme and filler words"""
+    rng = random.Random(seed)
+    vocabulary = list(gpi.THEME_TERMS) + FILLER_WORDS * 4
+    return [
+        {
+            "id": f"proj{i}",
+            "title": f"{rng.choice(FILLER_WORDS).title()} {i}",
+            "description": " ".join(rng.choice(vocabulary) for _ in range(words)),
+            "tags": rng.choice(("Python", "JavaScript, Web", "C++, Systems")),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_extract_theme_elements(project, rng=random):
+    """extract_theme_elements as it was with random fallback words"""
+    title = project.get("title", "")
+    description = project.get("description", "")
+    tags = project.get("tags", "").split(", ")
+
+    # Extract key concepts from the title
+    title_words = [
+        word
+        for word in title.split()
+        if len(word) > 3
+        and word.lower()
+        not in ("with", "using", "based", "that", "this", "for", "and", "the")
+    ]
+
+    # Extract key technologies from tags
+    tech_tags = []
+    for tag in tags:
+        if tag.lower() not in (
+            "software",
+            "development",
+            "programming",
+            "code",
+            "application",
+        ):
+            tech_tags.append(tag)
+
+    # Find interesting adjectives and nouns from description
+    interesting_terms = []
+    lower_desc = description.lower()
+
+    for term in [
+        "innovative",
+        "creative",
+        "dynamic",
+        "modern",
+        "intelligent",
+        "interactive",
+        "powerful",
+        "efficient",
+        "elegant",
+        "seamless",
+        "robust",
+        "advanced",
+        "visualization",
+        "automation",
+        "analysis",
+        "collaboration",
+        "communication",
+        "security",
+        "performance",
+        "optimization",
+        "interface",
+        "experience",
+        "data",
+        "cloud",
+        "network",
+        "mobile",
+        "web",
+        "system",
+        "platform",
+    ]:
+        if term.lower() in lower_desc:
+            interesting_terms.append(term)
+
+    # Get a few random words from description (fallback if nothing interesting found)
+    if len(interesting_terms) < 2:
+        desc_words = [word for word in description.split() if len(word) > 4]
+        if desc_words:
+            interesting_terms.extend(rng.sample(desc_words, min(3, len(desc_words))))
+
+    # Combine all elements
+    theme_elements = title_words + tech_tags + interesting_terms
+
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_elements = []
+    for item in theme_elements:
+        if item.lower() not in seen:
+            seen.add(item.lower())
+            unique_elements.append(item)
+
+    return unique_elements[:5]  # Return up to 5 elements
+
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    projects = synthetic_projects(args.projects, args.words)
+
+    def legacy():
+        rng = random.Random(0)
+        return [legacy_extract_theme_elements(p, rng) for p in projects]
+
+    def current():
+        return [gpi.extract_theme_elements(p) for p in projects]
+
+    legacy_time, legacy_themes = best_time(legacy, args.repeat)
+    current_time, current_themes = best_time(current, args.repeat)
+    same = sum(a == b for a, b in zip(legacy_themes, current_themes))
+
+    print(f"{args.projects} projects, {args.words} words per description")
+    for name, elapsed in (("legacy", legacy_time), ("current", current_time)):
+        print(
+            f"{name:>8}: {elapsed * 1000:8.1f} ms total, "
+            f"{elapsed / args.projects * 1e6:7.1f} us/project"
+        )
+    print(f" speedup: {legacy_time / current_time:.2f}x")
+    print(f"identical themes: {same}/{args.projects} (differences are fallback words)")
+
+    # Longest terms first, so a longer term wins where two start together
+    pattern = re.compile("|".join(sorted(gpi.THEME_TERMS, key=len, reverse=True)))
+    descriptions = [p["description"] for p in projects]
+
+    def scan():
+        return [gpi.match_theme_terms(d) for d in descriptions]
+
+    def regex():
+        found = [set(pattern.findall(d.lower())) for d in descriptions]
+        return [[t for t in gpi.THEME_TERMS if t in terms] for terms in found]
+
+    scan_time, scan_terms = best_time(scan, args.repeat)
+    regex_time, regex_terms = best_time(regex, args.repeat)
+    print("\nTheme-term matching only")
+    for name, elapsed in (("scan", scan_time), ("regex", regex_time)):
+        print(f"{name:>8}: {elapsed / args.projects * 1e6:7.1f} us/project")
+    print(f"same terms: {sum(a == b for a, b in zip(scan_terms, regex_terms))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Local stand-in servers for benchmarking the portfolio generators offline.
+
+FakeChatServer answers OpenAI-compatible chat completions and FakeGitHubServer
+answers the GitHub GraphQL and REST calls made by portfolio.py. Both can add
+latency and fail a fraction of requests.
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class FakeChatServer:
+    """
+    OpenAI-compatible chat completions server with a simple cost model
+
+    Every request pays prefill time proportional to its prompt tokens and decode
+    time proportional to the tokens it returns. At most `slots` requests are
+    processed at once, like an inference server with a fixed batch capacity.
+    """
+
+    def __init__(
+        self,
+        prefill_ms_per_token=0.2,
+        decode_ms_per_token=2.0,
+        slots=4,
+        port=0,
+        latency_ms=0.0,
+        error_rate=0.0,
+        seed=0,
+    ):
+        """
+        Args:
+            prefill_ms_per_token (float): Milliseconds per prompt token
+            decode_ms_per_token (float): Milliseconds per generated token
+            slots (int): Requests processed concurrently
+            port (int): Port to listen on (0 = pick a free port)
+            latency_ms (float): Extra delay before every response
+            error_rate (float): Fraction of requests answered with a 503
+            seed (int): Seed for choosing which requests fail
+        """
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.decode_ms_per_token = decode_ms_per_token
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._random = random.Random(seed)
+        self._slots = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def completion_for(prompt):
+        """Build a plausible completion for a portfolio enrichment prompt"""
+        names = re.findall(r"Repository Name: (.*)", prompt)
+        items = [
+            {
+                "repo_name": name.strip(),
+                "title": f"{name.strip().replace('-', ' ').title()} Platform",
+                "description": " ".join(["Detailed project description."] * 25),
+                "tags": "Python, Automation, Data, Web",
+                "project_status": "Active",
+                "license_type": "MIT",
+            }
+            for name in names
+        ]
+        if "JSON array" in prompt:
+            return json.dumps(items, indent=2)
+        item = items[0] if items else {"title": "Untitled"}
+        item.pop("repo_name", None)
+        return f"Here is the enhanced project:\n{json.dumps(item, indent=2)}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = "\n".join(m["content"] for m in body.get("messages", []))
+                content = server.completion_for(prompt)
+                prompt_tokens = estimate_tokens(prompt)
+                completion_tokens = estimate_tokens(content)
+                with server._lock:
+                    server.requests += 1
+                    server.prompt_tokens += prompt_tokens
+                    failed = server._random.random() < server.error_rate
+                    if failed:
+                        server.errors += 1
+                time.sleep(server.latency_ms / 1000)
+                if failed:
+                    self._send_json({"error": "overloaded"}, status=503)
+                    return
+                with server._slots:
+                    time.sleep(prompt_tokens * server.prefill_ms_per_token / 1000)
+                    if body.get("stream"):
+                        self._stream(content)
+                    else:
+                        time.sleep(
+                            completion_tokens * server.decode_ms_per_token / 1000
+                        )
+                        with server._lock:
+                            server.completion_tokens += completion_tokens
+                        self._send_json(
+                            {"choices": [{"message": {"content": content}}]}
+                        )
+
+            def _send_json(self, payload, status=200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    for i in range(0, len(content), 4):
+                        time.sleep(server.decode_ms_per_token / 1000)
+                        chunk = {
+                            "choices": [{"delta": {"content": content[i : i + 4]}}]
+                        }
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                        with server._lock:
+                            server.completion_tokens += 1
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed the stream early
+                    pass
+                self.close_connection = True
+
+        return Handler
+
+
+class FakeGitHubServer:
+    """
+    GitHub API stand-in serving a synthetic account of `repos` repositories
+
+    Answers the viewer and repositoryOwner repository GraphQL queries, the REST
+    user and repository listings used by PyGithub, and the single-item commit
+    and contributor listings whose "last" page link portfolio.py reads as a
+    count. Responses carry ETags and honour If-None-Match. With rate_limit set,
+    every response carries X-RateLimit-* headers and requests beyond the budget
+    of a window get a 403, like GitHub.
+    """
+
+    def __init__(
+        self,
+        repos=100,
+        login="bench",
+        max_page_size=100,
+        latency_ms=0.0,
+        error_rate=0.0,
+        seed=0,
+        port=0,
+        owners=None,
+        rate_limit=None,
+        rate_limit_window=60.0,
+    ):
+        """
+        Args:
+            repos (int): Number of public repositories owned by the account
+            login (str): Login of the authenticated user
+            max_page_size (int): Largest page returned by any listing
+            latency_ms (float): Delay before every response
+            error_rate (float): Fraction of requests answered with a 502
+            seed (int): Seed for the synthetic data and for choosing failures
+            port (int): Port to listen on (0 = pick a free port)
+            owners (dict): Other users or organizations -> number of repositories
+            rate_limit (int): Requests per window for each resource (None = unlimited)
+            rate_limit_window (float): Seconds until a spent budget is refilled
+        """
+        self.login = login
+        self.max_page_size = max_page_size
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.repositories = self.synthetic_repositories(repos, login, seed)
+        self._owners = {login: self.repositories}
+        for n, (owner, count) in enumerate(sorted((owners or {}).items()), start=1):
+            self._owners[owner] = self.synthetic_repositories(count, owner, seed + n)
+        self._by_name = {
+            r["full_name"]: r for repos in self._owners.values() for r in repos
+        }
+        self.requests = {}
+        self.errors = 0
+        self.rate_limited = 0
+        self._budgets = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+        self._rest_listings = {
+            owner.lower(): [self._rest_repo(i, r, owner) for i, r in enumerate(repos)]
+            for owner, repos in self._owners.items()
+        }
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def graphql_url(self):
+        return f"{self.url}/graphql"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.errors = 0
+            self.rate_limited = 0
+
+    def total_requests(self):
+        with self._lock:
+            return sum(self.requests.values())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def synthetic_repositories(count, login="bench", seed=0):
+        """Build `count` repositories with varied languages, sizes and licenses"""
+        rng = random.Random(seed)
+        languages = ["Python", "JavaScript", "TypeScript", "Go", "Rust", "C++", None]
+        licenses = ["MIT", "Apache-2.0", "GPL-3.0", None]
+        return [
+            {
+                "name": f"project-{i:04d}",
+                "full_name": f"{login}/project-{i:04d}",
+                "description": f"Synthetic benchmark repository number {i}",
+                "language": rng.choice(languages),
+                "license": rng.choice(licenses),
+                "stars": rng.randint(0, 500),
+                "forks": rng.randint(0, 50),
+                "commits": rng.randint(1, 5000),
+                "contributors": rng.randint(1, 30),
+                "created_at": "2023-01-01T00:00:00Z",
+                "updated_at": "2024-06-01T00:00:00Z",
+            }
+            for i in range(count)
+        ]
+
+    def _take(self, resource):
+        """
+        Spend one request of a resource's budget
+
+        Returns:
+            tuple: (rate-limit headers, True if the budget was already spent)
+        """
+        if self.rate_limit is None:
+            return {}, False
+        with self._lock:
+            now = time.time()
+            remaining, reset = self._budgets.get(resource, (self.rate_limit, 0))
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.rate_limit_window
+            limited = remaining <= 0
+            if limited:
+                self.rate_limited += 1
+            else:
+                remaining -= 1
+            self._budgets[resource] = (remaining, reset)
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(reset)),
+            "X-RateLimit-Used": str(self.rate_limit - remaining),
+            "X-RateLimit-Resource": resource,
+        }, limited
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return failed
+
+    def _graphql_node(self, repo):
+        return {
+            "name": repo["name"],
+            "nameWithOwner": repo["full_name"],
+            "description": repo["description"],
+            "url": f"https://github.com/{repo['full_name']}",
+            "createdAt": repo["created_at"],
+            "updatedAt": repo["updated_at"],
+            "stargazerCount": repo["stars"],
+            "forkCount": repo["forks"],
+            "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+            "licenseInfo": {"spdxId": repo["license"]} if repo["license"] else None,
+            "defaultBranchRef": {
+                "target": {"history": {"totalCount": repo["commits"]}}
+            },
+        }
+
+    def _rest_repo(self, index, repo, owner):
+        return {
+            "id": index + 1,
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "owner": {"login": owner, "type": "User"},
+            "private": False,
+            "html_url": f"https://github.com/{repo['full_name']}",
+            "url": f"{self.url}/repos/{repo['full_name']}",
+            "description": repo["description"],
+            "language": repo["language"],
+            "created_at": repo["created_at"],
+            "updated_at": repo["updated_at"],
+            "stargazers_count": repo["stars"],
+            "forks_count": repo["forks"],
+            "license": (
+                {"key": repo["license"].lower(), "spdx_id": repo["license"]}
+                if repo["license"]
+                else None
+            ),
+        }
+
+    def graphql_page(self, first, after=None, owner=None):
+        """Answer REPOSITORIES_QUERY (or OWNER_REPOSITORIES_QUERY for owner) for one page"""
+        field = "repositoryOwner" if owner else "viewer"
+        owner = owner or self.login
+        repositories = next(
+            (r for login, r in self._owners.items() if login.lower() == owner.lower()),
+            None,
+        )
+        if repositories is None:
+            return {
+                "data": {field: None},
+                "errors": [
+                    {
+                        "type": "NOT_FOUND",
+                        "path": [field],
+                        "message": "Could not resolve to a RepositoryOwner with "
+                        f"the login of '{owner}'.",
+                    }
+                ],
+            }
+        start = int(after or 0)
+        end = min(len(repositories), start + min(first, self.max_page_size))
+        return {
+            "data": {
+                field: {
+                    "login": owner,
+                    "repositories": {
+                        "pageInfo": {
+                            "hasNextPage": end < len(repositories),
+                            "endCursor": str(end),
+                        },
+                        "nodes": [
+                            self._graphql_node(r) for r in repositories[start:end]
+                        ],
+                    },
+                }
+            }
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self._fail("graphql", "graphql"):
+                    return
+                variables = body.get("variables") or {}
+                self._send_json(
+                    server.graphql_page(
+                        variables.get("first", 100),
+                        variables.get("after"),
+                        variables.get("login"),
+                    )
+                )
+
+            def do_GET(self):
+                self.rate_headers = {}
+                parts = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                path = parts.path.rstrip("/")
+                match = re.fullmatch(
+                    r"/repos/([^/]+/[^/]+)/(commits|contributors)", path
+                )
+                if match:
+                    repo = server._by_name.get(match.group(1))
+                    if self._fail(match.group(2)):
+                        return
+                    if repo is None:
+                        self._send_json({"message": "Not Found"}, status=404)
+                        return
+                    total = repo[
+                        "commits" if match.group(2) == "commits" else "contributors"
+                    ]
+                    self._send_listing(path, query, [{}] * total)
+                elif path == "/user":
+                    if self._fail("user"):
+                        return
+                    self._send_json({"login": server.login, "type": "User"})
+                elif path == "/user/repos" or re.fullmatch(r"/users/[^/]+/repos", path):
+                    if self._fail("repos"):
+                        return
+                    owner = (
+                        server.login if path == "/user/repos" else path.split("/")[2]
+                    )
+                    listing = server._rest_listings.get(owner.lower())
+                    if listing is None:
+                        self._send_json({"message": "Not Found"}, status=404)
+                        return
+                    self._send_listing(path, query, listing)
+                else:
+                    server._count("other")
+                    self._send_json({"message": "Not Found"}, status=404)
+
+            def _fail(self, kind, resource="core"):
+                self.rate_headers, limited = server._take(resource)
+                if limited:
+                    self._send_json({"message": "API rate limit exceeded"}, status=403)
+                    return True
+                failed = server._count(kind)
+                time.sleep(server.latency_ms / 1000)
+                if failed:
+                    self._send_json({"message": "Server Error"}, status=502)
+                return failed
+
+            def _send_listing(self, path, query, items):
+                per_page = min(int(query.get("per_page", 30)), server.max_page_size)
+                page = int(query.get("page", 1))
+                last = max(1, -(-len(items) // per_page))
+                links = []
+                if page < last:
+                    links.append(
+                        f'<{server.url}{path}?per_page={per_page}&page={page + 1}>; rel="next"'
+                    )
+                    links.append(
+                        f'<{server.url}{path}?per_page={per_page}&page={last}>; rel="last"'
+                    )
+                headers = {"Link": ", ".join(links)} if links else {}
+                self._send_json(
+                    items[(page - 1) * per_page : page * per_page], headers=headers
+                )
+
+            def _send_json(self, payload, status=200, headers=None):
+                data = json.dumps(payload).encode()
+                etag = f'"{hashlib.sha1(data).hexdigest()}"'
+                headers = {**getattr(self, "rate_headers", {}), **(headers or {})}
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Build a tiny randomly initialized Stable Diffusion pipeline for offline benchmarks.
+
+The pipeline has the same components and call signature as a real checkpoint
+(UNet, VAE, CLIP text encoder and tokenizer, scheduler) but only a few
+thousand weights, so generate_portfolio_images.py can run end to end on a CPU
+in seconds without downloading anything. Its images are noise.
+"""
+
+import os
+import json
+import argparse
+
+DEFAULT_PATH = ".cache/tiny-sd"
+
+
+def _byte_level_vocab():
+    """CLIP byte-level vocabulary without merges (every byte is a token)"""
+    printable = (
+        list(range(ord("!"), ord("~") + 1))
+        + list(range(ord("¡"), ord("¬") + 1))
+        + list(range(ord("®"), ord("ÿ") + 1))
+    )
+    codes = printable[:]
+    extra = 0
+    for b in range(256):
+        if b not in printable:
+            printable.append(b)
+            codes.append(256 + extra)
+            extra += 1
+    chars = [chr(c) for c in codes]
+    vocab = {c: i for i, c in enumerate(chars)}
+    vocab.update({f"{c}</w>": len(chars) + i for i, c in enumerate(chars)})
+    vocab["<|startoftext|>"] = len(vocab)
+    vocab["<|endoftext|>"] = len(vocab)
+    return vocab
+
+
+def build_tiny_pipeline(path=DEFAULT_PATH, seed=0):
+    """
+    Save a tiny random pipeline to path (loadable with --model path)
+
+    Args:
+        path (str): Output directory
+        seed (int): Seed for the random weights
+
+    Returns:
+        str: path
+    """
+    import torch
+    from diffusers import (
+        AutoencoderKL,
+        DDIMScheduler,
+        StableDiffusionPipeline,
+        UNet2DConditionModel,
+    )
+    from transformers import CLIPTextConfig, CLIPTextModel, CLIPTokenizer
+
+    torch.manual_seed(seed)
+    unet = UNet2DConditionModel(
+        block_out_channels=(8, 16),
+        layers_per_block=1,
+        sample_size=32,
+        in_channels=4,
+        out_channels=4,
+        down_block_types=("DownBlock2D", "CrossAttnDownBlock2D"),
+        up_block_types=("CrossAttnUpBlock2D", "UpBlock2D"),
+        cross_attention_dim=16,
+        norm_num_groups=8,
+        attention_head_dim=2,
+    )
+    vae = AutoencoderKL(
+        block_out_channels=(8, 8, 16, 16),
+        in_channels=3,
+        out_channels=3,
+        down_block_types=("DownEncoderBlock2D",) * 4,
+        up_block_types=("UpDecoderBlock2D",) * 4,
+        latent_channels=4,
+        norm_num_groups=8,
+    )
+
+    tokenizer_dir = os.path.join(path, "tokenizer-files")
+    os.makedirs(tokenizer_dir, exist_ok=True)
+    vocab = _byte_level_vocab()
+    vocab_file = os.path.join(tokenizer_dir, "vocab.json")
+    merges_file = os.path.join(tokenizer_dir, "merges.txt")
+    with open(vocab_file, "w") as f:
+        json.dump(vocab, f)
+    with open(merges_file, "w") as f:
+        f.write("#version: 0.2\n")
+    tokenizer = CLIPTokenizer(
+        vocab_file, merges_file, model_max_length=77, pad_token="<|endoftext|>"
+    )
+    text_encoder = CLIPTextModel(
+        CLIPTextConfig(
+            bos_token_id=0,
+            eos_token_id=2,
+            hidden_size=16,
+            intermediate_size=32,
+            num_attention_heads=2,
+            num_hidden_layers=2,
+            vocab_size=len(vocab),
+            max_position_embeddings=77,
+        )
+    )
+    scheduler = DDIMScheduler(
+        beta_start=0.00085,
+        beta_end=0.012,
+        beta_schedule="scaled_linear",
+        clip_sample=False,
+        set_alpha_to_one=False,
+        steps_offset=1,
+    )
+
+    pipeline = StableDiffusionPipeline(
+        unet=unet,
+        vae=vae,
+        text_encoder=text_encoder,
+        tokenizer=tokenizer,
+        scheduler=scheduler,
+        safety_checker=None,
+        feature_extractor=None,
+        requires_safety_checker=False,
+    )
+    pipeline.save_pretrained(path)
+    return path
+
+
+def ensure_tiny_pipeline(path=DEFAULT_PATH):
+    """Build the tiny pipeline at path unless it is already there"""
+    if not os.path.exists(os.path.join(path, "model_index.json")):
+        print(f"Building tiny random pipeline in {path}...")
+        build_tiny_pipeline(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a tiny random Stable Diffusion pipeline for benchmarks"
+    )
+    parser.add_argument(
+        "path", nargs="?", default=DEFAULT_PATH, help="Output directory"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the weights")
+    args = parser.parse_args()
+    build_tiny_pipeline(args.path, args.seed)
+    print(f"Saved tiny pipeline to {args.path}; use --model {args.path}")
+
+
+if __name__ == "__main__":
+    main()
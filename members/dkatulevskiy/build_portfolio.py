@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Build Portfolio - Rebuild projects.json and the project images in one step,
+doing only the work whose inputs changed.
+
+Dependencies are tracked at every step:
+    repository metadata -> enriched record   (fingerprints in projects.state.json)
+    enriched record     -> prompt -> image   (render hashes in assets/manifest.json)
+    image               -> responsive variants (file modification times)
+Images rendered for projects that no longer exist are pruned.
+
+Only images recorded in the manifest are re-rendered or pruned. An existing
+project image without an entry (rendered before the manifest existed) is
+recorded under the plan of projects.json as it was before enrichment, so a
+record change still re-renders it. Such adopted images may be hand-made, so
+neither they nor their responsive variants are resized or deleted; they are
+only replaced once their inputs change. Assets that are not a project's image
+are never recorded or touched.
+
+With --stream, images are rendered while the LLM is still enriching the
+remaining repositories.
+"""
+
+import json
+import time
+import queue
+import shlex
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import portfolio
+import generate_portfolio_images as gpi
+
+# Fields of a project that feed its image prompt
+PROMPT_FIELDS = ("title", "description", "tags")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Rebuild out-of-date portfolio records and images"
+    )
+    parser.add_argument(
+        "--num_repos",
+        type=str,
+        default="all",
+        help="Number of top repositories to include, or 'all'",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Show the image work for the current projects.json without doing it",
+    )
+    parser.add_argument(
+        "--skip_enrich",
+        action="store_true",
+        help="Do not contact GitHub or the LLM; rebuild images from projects.json",
+    )
+    parser.add_argument(
+        "--no_prune",
+        action="store_true",
+        help="Keep rendered images of projects that no longer exist",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Render each image as soon as its project is enriched (in-process or daemon)",
+    )
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=4,
+        help="Enriched projects that may wait for the renderer before enrichment blocks",
+    )
+    parser.add_argument(
+        "--portfolio_args",
+        type=str,
+        default="",
+        help="Extra arguments passed to portfolio.py (e.g. '--batch_size 4')",
+    )
+    parser.add_argument(
+        "--image_args",
+        type=str,
+        default="",
+        help="Extra arguments passed to generate_portfolio_images.py (e.g. '--model ...')",
+    )
+    return parser.parse_args()
+
+
+def load_projects_by_id(path=portfolio.OUTPUT_FILE):
+    """Projects of an existing projects.json keyed by id (empty if missing)"""
+    try:
+        with open(path, "r") as f:
+            return {project["id"]: project for project in json.load(f)}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def describe_record_changes(before, after):
+    """
+    Print how the enriched records changed and which prompts they affect
+
+    Args:
+        before (dict): Projects by id before enrichment
+        after (dict): Projects by id after enrichment
+
+    Returns:
+        int: Number of projects whose prompt inputs changed
+    """
+    changed = 0
+    for project_id, project in after.items():
+        old = before.get(project_id)
+        if old is None:
+            print(f"{project_id}: new project")
+            changed += 1
+            continue
+        fields = [f for f in PROMPT_FIELDS if old.get(f) != project.get(f)]
+        if old.get("github") != project.get("github"):
+            fields.insert(0, "repository")
+        if fields:
+            print(f"{project_id}: {', '.join(fields)} changed")
+            changed += 1
+    for project_id in before:
+        if project_id not in after:
+            print(f"{project_id}: removed")
+    return changed
+
+
+def adopt_existing_images(image_argv):
+    """Record untracked project images under the current projects.json"""
+    image_args = gpi.parse_args(image_argv)
+    try:
+        with open(image_args.projects_file, "r") as f:
+            projects = json.load(f)
+    except (OSError, ValueError):
+        return
+    manifest = gpi.load_manifest(image_args.manifest)
+    adopted = gpi.adopt_existing_images(manifest, projects, image_args)
+    if adopted:
+        gpi.save_manifest(image_args.manifest, manifest)
+        print(
+            f"Recorded {len(adopted)} existing images in {image_args.manifest} "
+            "before enrichment"
+        )
+
+
+def stream_build(args, portfolio_argv, image_argv):
+    """
+    Run enrichment with the renderer consuming projects through a bounded queue
+
+    The normal image step afterwards keeps everything rendered here.
+
+    Returns:
+        list: Portfolio projects written, or None if enrichment did not finish
+    """
+    project_queue = queue.Queue(maxsize=max(1, args.queue_size))
+    image_args = gpi.parse_args(image_argv)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = executor.submit(gpi.render_stream, project_queue, image_args)
+        try:
+            projects = portfolio.main(
+                portfolio_argv,
+                on_project=lambda i, project: project_queue.put((i, project)),
+            )
+        finally:
+            project_queue.put(None)
+        enriched = time.perf_counter() - start
+        rendered = renderer.result()
+    print(
+        f"Streamed {rendered} images while enriching ({enriched:.1f}s enrichment, "
+        f"{time.perf_counter() - start:.1f}s total)"
+    )
+    return projects
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+
+    image_argv = shlex.split(args.image_args)
+    if not (args.skip_enrich or args.plan):
+        print("== Records: GitHub repositories -> projects.json ==")
+        before = load_projects_by_id()
+        # Before the records change, so untracked images can be found stale
+        adopt_existing_images(image_argv)
+        portfolio_argv = ["--incremental", "--num_repos", args.num_repos]
+        portfolio_argv += shlex.split(args.portfolio_args)
+        streaming = args.stream and "--override_existing" not in image_argv
+        if args.stream and not streaming:
+            print("Not streaming: --override_existing re-renders after enrichment")
+        if streaming:
+            projects = stream_build(args, portfolio_argv, image_argv)
+        else:
+            projects = portfolio.main(portfolio_argv)
+        if projects is None:
+            print("Enrichment did not finish; images were not rebuilt")
+            return
+        after = {project["id"]: project for project in projects}
+        changed = describe_record_changes(before, after)
+        print(f"{changed} of {len(after)} projects have new prompt inputs")
+
+    print("\n== Images: projects.json -> assets ==")
+    if args.plan:
+        image_argv.append("--plan")
+    if not args.no_prune:
+        image_argv.append("--prune")
+    gpi.main(image_argv)
+
+    print(f"\nBuild finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
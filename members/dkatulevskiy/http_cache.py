@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP response cache with conditional requests (ETag / Last-Modified).
+
+Responses to GET requests are stored on disk. Later requests for the same URL
+send If-None-Match / If-Modified-Since, and a 304 Not Modified is answered from
+the stored copy. The cache directory is bounded in size and evicts the least
+recently used entries first.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import tempfile
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CachedSession(requests.Session):
+    """requests.Session that revalidates GET responses against an on-disk cache"""
+
+    def __init__(self, cache_dir=".cache/http", max_bytes=100 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Directory holding cached responses
+            max_bytes (int): Total size the cache directory may grow to
+        """
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = None
+
+    def request(self, method, url, **kwargs):
+        if method.upper() != "GET":
+            return super().request(method, url, **kwargs)
+
+        key = self._cache_key(url, kwargs.get("params"))
+        entry = self._load(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry["headers"].get("ETag"):
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = super().request(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            with self._lock:
+                self.hits += 1
+            self._touch(key)
+            return self._build_response(entry, response)
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code == 200 and (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            self._store(key, response)
+        return response
+
+    def stats(self):
+        """Return a dict with cache hits, misses and hit rate"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _cache_key(self, url, params):
+        prepared = requests.Request("GET", url, params=params).prepare()
+        # Keep responses for different credentials apart
+        auth = self.headers.get("Authorization", "")
+        digest = hashlib.sha256(f"{auth}\n{prepared.url}".encode()).hexdigest()
+        return digest
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, key):
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _store(self, key, response):
+        entry = {
+            "url": response.url,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    @staticmethod
+    def _build_response(entry, not_modified):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        response.url = entry["url"]
+        response.request = not_modified.request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        # Rate-limit headers describe the current budget, not the cached response
+        response.headers.update(
+            {
+                name: value
+                for name, value in not_modified.headers.items()
+                if name.lower().startswith("x-ratelimit-")
+            }
+        )
+        response.from_cache = True
+        return response
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Persistent cache for LLM completions, backed by SQLite.
+
+Entries are keyed by everything that determines a completion (model, prompts,
+sampling parameters), expire after an optional TTL, and are evicted least
+recently used first once the cache grows past its entry or size limit.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class LLMCache:
+    """SQLite-backed completion cache with TTL and LRU eviction"""
+
+    def __init__(
+        self,
+        path=".cache/llm.sqlite3",
+        ttl=None,
+        max_entries=10000,
+        max_bytes=200 * 1024 * 1024,
+    ):
+        """
+        Args:
+            path (str): SQLite database file
+            ttl (float): Seconds an entry stays valid (None = forever)
+            max_entries (int): Maximum number of cached completions
+            max_bytes (int): Maximum total size of cached completions
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                elapsed REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(model, system_prompt, prompt, temperature, max_tokens):
+        """
+        Build the cache key for a completion request
+
+        Returns:
+            str: Hex digest of the request parameters
+        """
+        request = [model, system_prompt, prompt, temperature, max_tokens]
+        return hashlib.sha256(json.dumps(request).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached completion
+
+        Args:
+            key (str): Result of make_key
+
+        Returns:
+            str: Cached completion, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created, elapsed FROM completions WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE completions SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self.hits += 1
+            self.saved_seconds += row[2]
+            return row[0]
+
+    def put(self, key, response, elapsed):
+        """
+        Store a completion
+
+        Args:
+            key (str): Result of make_key
+            response (str): Completion text
+            elapsed (float): Seconds the request took, reported as saved on later hits
+        """
+        now = time.time()
+        size = len(response.encode())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, now, now, elapsed, size),
+            )
+            self._evict()
+            self._db.commit()
+
+    def delete(self, key):
+        """Drop a completion, e.g. one that turned out not to be usable"""
+        with self._lock:
+            self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until within limits"""
+        if self.ttl is not None:
+            self._db.execute(
+                "DELETE FROM completions WHERE created < ?", (time.time() - self.ttl,)
+            )
+        count, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM completions ORDER BY accessed ASC"
+        ).fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+
+    def stats(self):
+        """Return a dict with hits, misses, hit rate and inference seconds saved"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
@@ -8,11 +8,25 @@ import os
 import json
 import re
 import time
+import hashlib
+import tempfile
+import gzip
 import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 import requests
-from actions import GitHubActions
+from http_cache import CachedSession
+from llm_cache import LLMCache
+from rate_limit import RateLimitBudget
+from run_report import start_report, stage, count
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Load environment variables
 load_dotenv()
@@ -21,9 +35,507 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 API_ENDPOINT = os.getenv("API_ENDPOINT", "http://localhost:3000/api/chat/completions")
 MODEL_NAME = os.getenv("MODEL_NAME", "phi4:latest")
 OUTPUT_FILE = "projects.json"
+STATE_FILE = "projects.state.json"
+JOURNAL_FILE = "projects.journal.jsonl"
+PAGES_DIR = "projects"
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "4"))
+SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "image",
+    "alt",
+    "github",
+    "tags",
+    "commit_count",
+    "contributors",
+    "project_status",
+    "license_type",
+)
+GITHUB_WORKERS = int(os.getenv("GITHUB_WORKERS", "8"))
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "graphql")
+GITHUB_GRAPHQL_PAGE_SIZE = int(os.getenv("GITHUB_GRAPHQL_PAGE_SIZE", "50"))
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", ".cache/github")
+GITHUB_CACHE_MAX_MB = int(os.getenv("GITHUB_CACHE_MAX_MB", "100"))
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "10"))
+GITHUB_RATE_LIMIT_RETRIES = int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", "3"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", "1.0"))
+# 429 is handled as a rate limit, after the reset time
+GITHUB_RETRY_STATUS_CODES = {500, 502, 503, 504}
+ACCOUNTS_DIR = "portfolios"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm.sqlite3")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "300"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+LLM_STREAM = os.getenv("LLM_STREAM", "0") == "1"
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "1"))
+# Completion budget of a batched request: per project, and for the whole request
+LLM_BATCH_ITEM_TOKENS = int(os.getenv("LLM_BATCH_ITEM_TOKENS", "600"))
+LLM_BATCH_MAX_TOKENS = int(os.getenv("LLM_BATCH_MAX_TOKENS", "4096"))
+
+REPOSITORY_FIELDS = """
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        nameWithOwner
+        description
+        url
+        createdAt
+        updatedAt
+        stargazerCount
+        forkCount
+        primaryLanguage { name }
+        licenseInfo { spdxId }
+        defaultBranchRef { target { ... on Commit { history { totalCount } } } }
+      }
+"""
+
+REPOSITORIES_QUERY = (
+    """
+query($first: Int!, $after: String) {
+  viewer {
+    login
+    repositories(
+      first: $first
+      after: $after
+      privacy: PUBLIC
+      ownerAffiliations: OWNER
+      orderBy: {field: NAME, direction: ASC}
+    ) {"""
+    + REPOSITORY_FIELDS
+    + """    }
+  }
+}
+"""
+)
+
+# Same listing for any user or organization
+OWNER_REPOSITORIES_QUERY = (
+    """
+query($login: String!, $first: Int!, $after: String) {
+  repositoryOwner(login: $login) {
+    login
+    repositories(
+      first: $first
+      after: $after
+      privacy: PUBLIC
+      ownerAffiliations: OWNER
+      orderBy: {field: NAME, direction: ASC}
+    ) {"""
+    + REPOSITORY_FIELDS
+    + """    }
+  }
+}
+"""
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate projects.json from your public GitHub repositories"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=GITHUB_WORKERS,
+        help="Number of repositories to collect metadata for concurrently (1 = sequential)",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=GITHUB_BACKEND,
+        choices=["graphql", "rest"],
+        help="How to fetch repository metadata (graphql falls back to rest on failure)",
+    )
+    parser.add_argument(
+        "--no_http_cache",
+        action="store_true",
+        help="Do not use the on-disk ETag cache for GitHub REST requests",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse enriched details from the existing projects.json for unchanged repositories",
+    )
+    parser.add_argument(
+        "--no_llm_cache",
+        action="store_true",
+        help="Bypass the persistent LLM response cache",
+    )
+    parser.add_argument(
+        "--llm_cache_ttl",
+        type=float,
+        default=None,
+        help="Hours a cached LLM response stays valid (default: forever)",
+    )
+    parser.add_argument(
+        "--llm_concurrency",
+        type=int,
+        default=LLM_CONCURRENCY,
+        help="Number of repositories to enrich concurrently (1 = sequential)",
+    )
+    parser.add_argument(
+        "--llm_timeout",
+        type=float,
+        default=LLM_TIMEOUT,
+        help="Seconds to wait for a single LLM response",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=LLM_STREAM,
+        help="Stream LLM responses and stop as soon as the JSON object is complete",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=LLM_BATCH_SIZE,
+        help="Number of repositories to enrich per LLM request (1 = one per call)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip repositories already enriched by an interrupted run (from the journal)",
+    )
+    parser.add_argument(
+        "--page_size",
+        type=int,
+        default=PAGE_SIZE,
+        help="Projects per page shard written for the front-end loader",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Path of the JSON run report (default: .cache/reports/portfolio-<time>.json)",
+    )
+    parser.add_argument(
+        "--profile_stage",
+        type=str,
+        default=None,
+        help="Profile every run of a stage, e.g. llm_enrichment or github_listing",
+    )
+    parser.add_argument(
+        "--profiler",
+        type=str,
+        default="cprofile",
+        choices=["cprofile", "pyinstrument"],
+        help="Profiler used for --profile_stage",
+    )
+    parser.add_argument(
+        "--num_repos",
+        type=str,
+        default=None,
+        help="Number of top repositories to include, or 'all' (default: ask)",
+    )
+    parser.add_argument(
+        "--accounts",
+        type=str,
+        default=None,
+        help="Comma-separated users or organizations to build portfolios for (batch mode)",
+    )
+    parser.add_argument(
+        "--accounts_file",
+        type=str,
+        default=None,
+        help="File with one user or organization per line (batch mode)",
+    )
+    parser.add_argument(
+        "--account_workers",
+        type=int,
+        default=4,
+        help="Accounts processed concurrently in batch mode",
+    )
+    parser.add_argument(
+        "--output_root",
+        type=str,
+        default=ACCOUNTS_DIR,
+        help="Batch mode writes each account's portfolio to <output_root>/<login>/",
+    )
+    return parser.parse_args(argv)
+
+
+_llm_cache = None
+
+
+def init_llm_cache(enabled=True, ttl_hours=None):
+    """
+    Open the persistent LLM response cache used by call_llm_api
+
+    Args:
+        enabled (bool): False bypasses the cache entirely
+        ttl_hours (float): Hours a cached response stays valid (None = forever)
+
+    Returns:
+        LLMCache: The cache, or None when disabled
+    """
+    global _llm_cache
+    _llm_cache = None
+    if enabled:
+        _llm_cache = LLMCache(
+            LLM_CACHE_PATH,
+            ttl=ttl_hours * 3600 if ttl_hours is not None else None,
+            max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _llm_cache
+
+
+_llm_session = None
+_llm_session_lock = threading.Lock()
+_llm_timeout = LLM_TIMEOUT
+_llm_stream = LLM_STREAM
+# Metrics (and the cache entry awaiting validation) of the most recent
+# call_llm_api call made by the current thread
+_llm_call_metrics = threading.local()
+
+
+def init_llm_session(pool_size=LLM_CONCURRENCY, timeout=LLM_TIMEOUT, stream=LLM_STREAM):
+    """
+    Create the shared keep-alive session used by call_llm_api
+
+    Args:
+        pool_size (int): Number of pooled connections to the inference server
+        timeout (float): Seconds to wait for a single response
+        stream (bool): Stream completions by default
+
+    Returns:
+        requests.Session: The shared session
+    """
+    global _llm_session, _llm_timeout, _llm_stream
+    _llm_stream = stream
+    with _llm_session_lock:
+        _llm_session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=max(1, pool_size)
+        )
+        _llm_session.mount("http://", adapter)
+        _llm_session.mount("https://", adapter)
+        _llm_timeout = timeout
+        return _llm_session
+
+
+def _retry_delay(attempt, response=None, base=None):
+    """Seconds to wait before retry number attempt (0-based), honoring Retry-After"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    base = LLM_BACKOFF_BASE if base is None else base
+    return base * (2**attempt) * random.uniform(0.5, 1.5)
+
+
+def post_llm_request(payload, headers, stream=False):
+    """
+    POST a chat completion request, retrying 429/5xx responses and connection errors
+
+    Args:
+        payload (dict): Request body
+        headers (dict): Request headers
+        stream (bool): Return before the body is read, for server-sent events
+
+    Returns:
+        requests.Response: Successful response
+    """
+    session = _llm_session or init_llm_session()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        count("llm_http_requests")
+        if attempt:
+            count("llm_retries")
+        try:
+            response = session.post(
+                API_ENDPOINT,
+                headers=headers,
+                json=payload,
+                timeout=_llm_timeout,
+                stream=stream,
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt)
+            print(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if response.status_code in RETRY_STATUS_CODES and attempt < LLM_MAX_RETRIES:
+            delay = _retry_delay(attempt, response)
+            # Return the connection to the pool before waiting (stream=True
+            # keeps it checked out until the body is read or closed)
+            response.close()
+            print(
+                f"LLM server returned {response.status_code}, retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        return response
+
+
+class JSONObjectScanner:
+    """
+    Find the first complete, valid JSON object in text that arrives in pieces
+
+    Tracks bracket depth outside of string literals so the object can be detected
+    the moment its closing bracket arrives, without re-scanning earlier text.
+    Values without the expected shape (e.g. "[1]" or "{}" in surrounding prose)
+    are skipped and scanning continues.
+    """
+
+    def __init__(self, opening="{", accept=None):
+        """
+        Args:
+            opening (str): "{" to find an object, "[" to find an array
+            accept (callable): Predicate the parsed value must satisfy (default:
+                any value of the opening's container type)
+        """
+        self.opening = opening
+        self.accept = accept
+        self.text = ""
+        self.value = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """
+        Add text and look for a complete object
+
+        Args:
+            chunk (str): Next piece of the response
+
+        Returns:
+            str: Text up to and including the closing brace of the first valid
+                object, or None if no object is complete yet
+        """
+        self.text += chunk
+        while self._pos < len(self.text):
+            char = self.text[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if char == self.opening:
+                    self._start = self._pos - 1
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        value = json.loads(self.text[self._start : self._pos])
+                        if isinstance(
+                            value, dict if self.opening == "{" else list
+                        ) and (self.accept is None or self.accept(value)):
+                            self.value = value
+                            return self.text[: self._pos]
+                        raise ValueError("unexpected JSON value")
+                    except ValueError:
+                        # Not JSON after all; look for the next opening bracket
+                        self._pos = self._start + 1
+                        self._start = None
+        return None
+
 
+def is_project_details(value):
+    """
+    True if value is an object with at least a title and a description
+
+    Missing tags, status and license fall back to defaults in build_project.
+    """
+    return isinstance(value, dict) and all(field in value for field in REQUIRED_FIELDS)
+
+
+def is_batch_details(value):
+    """True if value is a non-empty list of objects naming their repository"""
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(item, dict) and "repo_name" in item for item in value)
+    )
+
+
+def _stream_llm_completion(payload, headers, opening="{", accept=None):
+    """
+    Stream a chat completion and stop once it contains a complete JSON value
+
+    Args:
+        payload (dict): Request body (without the stream flag)
+        headers (dict): Request headers
+        opening (str): "{" to stop after an object, "[" to stop after an array
+        accept (callable): Predicate the JSON value must satisfy to stop
+
+    Returns:
+        tuple: (response text, metrics dict with ttft, tokens, tokens_per_second,
+            stopped_early)
+    """
+    start = time.perf_counter()
+    response = post_llm_request({**payload, "stream": True}, headers, stream=True)
+    scanner = JSONObjectScanner(opening, accept)
+    content = None
+    first_token = None
+    tokens = 0
+    try:
+        # Server-sent events are UTF-8 by definition; requests would fall back
+        # to ISO-8859-1 when the Content-Type has no charset
+        for line in response.iter_lines():
+            line = line.decode("utf-8")
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data).get("choices", [{}])[0].get("delta", {})
+            piece = delta.get("content")
+            if not piece:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter()
+            tokens += 1
+            content = scanner.feed(piece)
+            if content is not None:
+                break
+    finally:
+        # Closing the connection tells the server to stop generating
+        response.close()
 
-def call_llm_api(prompt, system_prompt=None, temperature=0.7, max_tokens=2000):
+    end = time.perf_counter()
+    generation_time = end - first_token if first_token is not None else 0.0
+    metrics = {
+        "ttft": (first_token - start) if first_token is not None else None,
+        "tokens": tokens,
+        "tokens_per_second": tokens / generation_time if generation_time > 0 else 0.0,
+        "stopped_early": content is not None,
+        "elapsed": end - start,
+    }
+    return (content if content is not None else scanner.text), metrics
+
+
+def call_llm_api(
+    prompt,
+    system_prompt=None,
+    temperature=0.7,
+    max_tokens=2000,
+    stream=None,
+    expect="{",
+    accept=None,
+):
     """
     Call the LLM API with a prompt
 
@@ -32,10 +544,19 @@ def call_llm_api(prompt, system_prompt=None, temperature=0.7, max_tokens=2000):
         system_prompt (str): Optional system prompt
         temperature (float): Sampling temperature
         max_tokens (int): Maximum tokens to generate
+        stream (bool): Stream the response and stop after the first complete
+            JSON value (default: the --stream setting)
+        expect (str): JSON value a streamed response stops after: "{" or "["
+        accept (callable): Predicate that JSON value must satisfy
 
     Returns:
-        str: LLM response
+        str: LLM response (cached only once the caller confirms it with
+            cache_llm_response)
     """
+    if stream is None:
+        stream = _llm_stream
+    _llm_call_metrics.last = None
+    _llm_call_metrics.pending = None
     if system_prompt is None:
         system_prompt = "You are a helpful assistant that creates compelling descriptions and tags for software projects."
 
@@ -54,37 +575,259 @@ def call_llm_api(prompt, system_prompt=None, temperature=0.7, max_tokens=2000):
     if JWT_TOKEN:
         headers["Authorization"] = f"Bearer {JWT_TOKEN}"
 
+    cache_key = None
+    if _llm_cache is not None:
+        cache_key = LLMCache.make_key(
+            MODEL_NAME, system_prompt, prompt, temperature, max_tokens
+        )
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            count("llm_cache_hits")
+            _llm_call_metrics.pending = (cache_key, None, None)
+            return cached
+
     try:
-        response = requests.post(API_ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        # Extract content from the response
-        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        start = time.perf_counter()
+        with stage("llm_request"):
+            if stream:
+                content, _llm_call_metrics.last = _stream_llm_completion(
+                    payload, headers, expect, accept
+                )
+            else:
+                response = post_llm_request(payload, headers)
+                result = response.json()
+                # Extract content from the response
+                content = (
+                    result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                )
+        if cache_key is not None and content:
+            _llm_call_metrics.pending = (
+                cache_key,
+                content,
+                time.perf_counter() - start,
+            )
         return content
     except Exception as e:
+        count("llm_errors")
         print(f"Error calling LLM API: {e}")
         return f"Error: {str(e)}"
 
 
-def get_contributors_count(github_actions, repo_full_name):
+def cache_llm_response(valid=True):
+    """
+    Settle the LLM cache entry of this thread's last call_llm_api call
+
+    Responses are only cached once the caller has parsed and validated them, so
+    a truncated or malformed completion is never replayed on later runs. A
+    cached response that fails validation is dropped.
+
+    Args:
+        valid (bool): Whether the response parsed into the expected JSON
+    """
+    pending = getattr(_llm_call_metrics, "pending", None)
+    _llm_call_metrics.pending = None
+    if pending is None or _llm_cache is None:
+        return
+    cache_key, content, elapsed = pending
+    if content is None:
+        # Answered from the cache
+        if not valid:
+            _llm_cache.delete(cache_key)
+    elif valid:
+        _llm_cache.put(cache_key, content, elapsed)
+
+
+_github_session = None
+_github_session_lock = threading.Lock()
+_github_request_count = 0
+# One budget for every thread (and every account) using the token
+_rate_limit = RateLimitBudget(reserve=GITHUB_RATE_LIMIT_RESERVE)
+
+
+def init_github_session(use_cache=True):
+    """
+    Create the shared keep-alive session used for direct GitHub API calls
+
+    Args:
+        use_cache (bool): Revalidate GET responses against the on-disk ETag cache
+
+    Returns:
+        requests.Session: The shared session
+    """
+    global _github_session
+    with _github_session_lock:
+        if use_cache:
+            _github_session = CachedSession(
+                GITHUB_CACHE_DIR, max_bytes=GITHUB_CACHE_MAX_MB * 1024 * 1024
+            )
+        else:
+            _github_session = requests.Session()
+        _github_session.headers["Accept"] = "application/vnd.github+json"
+        if GITHUB_TOKEN:
+            _github_session.headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+        return _github_session
+
+
+def _get_github_session():
+    """Return the shared GitHub session, creating a cached one on first use"""
+    if _github_session is None:
+        return init_github_session()
+    return _github_session
+
+
+def github_request(method, url, **kwargs):
+    """
+    Make a request against the GitHub API through the shared session
+
+    Args:
+        method (str): HTTP method
+        url (str): Absolute URL or path relative to GITHUB_API_URL
+        **kwargs: Extra arguments passed to requests
+
+    Server errors (5xx) and connection errors are retried with exponential
+    backoff, rate-limited responses after the rate limit resets.
+
+    Returns:
+        requests.Response: Response with a successful status code
+    """
+    global _github_request_count
+    if not url.startswith("http"):
+        url = f"{GITHUB_API_URL}{url}"
+    resource = "graphql" if url == GITHUB_GRAPHQL_URL else "core"
+    rate_limited = retries = 0
+    while True:
+        _rate_limit.acquire(resource)
+        with _github_session_lock:
+            _github_request_count += 1
+        count("github_http_requests")
+        try:
+            response = _get_github_session().request(method, url, timeout=30, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if retries == GITHUB_MAX_RETRIES:
+                raise
+            delay = _retry_delay(retries, base=GITHUB_BACKOFF_BASE)
+            retries += 1
+            count("github_retries")
+            print(f"GitHub request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        _rate_limit.update(response.headers, resource)
+        if (
+            response.status_code in GITHUB_RETRY_STATUS_CODES
+            and retries < GITHUB_MAX_RETRIES
+        ):
+            delay = _retry_delay(retries, response, base=GITHUB_BACKOFF_BASE)
+            retries += 1
+            count("github_retries")
+            response.close()
+            print(
+                f"GitHub returned {response.status_code} for {url}, "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            continue
+        reset = _rate_limit_reset(response)
+        if reset is None or rate_limited == GITHUB_RATE_LIMIT_RETRIES:
+            break
+        # Rate limited: every thread waits for the reset, then this one retries
+        rate_limited += 1
+        count("github_rate_limited")
+        _rate_limit.exhausted(resource, reset)
+    if getattr(response, "from_cache", False):
+        count("github_cache_revalidations")
+    response.raise_for_status()
+    return response
+
+
+def _rate_limit_reset(response):
+    """
+    When a rate-limited GitHub response allows retrying (None if it was not rate limited)
+
+    Args:
+        response (requests.Response): GitHub API response
+
+    Returns:
+        float: Unix time to wait for, or None
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return time.time() + int(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return float(response.headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return time.time() + 60
+    return None
+
+
+def count_paginated_items(path, params=None):
+    """
+    Count the items behind a paginated REST endpoint with a single request
+
+    Requests one item per page and reads the page number of the "last" link,
+    instead of walking every page.
+
+    Args:
+        path (str): API path, e.g. /repos/username/repo/commits
+        params (dict): Extra query parameters
+
+    Returns:
+        int: Total number of items
+    """
+    response = github_request("GET", path, params={**(params or {}), "per_page": 1})
+    last = response.links.get("last", {}).get("url")
+    if last:
+        match = re.search(r"[?&]page=(\d+)", last)
+        if match:
+            return int(match.group(1))
+    if response.status_code == 204 or not response.content:
+        return 0
+    return len(response.json())
+
+
+def get_contributors_count(github_actions, repo):
     """
     Get the total number of contributors for a repository
+
+    Args:
+        github_actions (GitHubActions): GitHub actions instance
+        repo (Repository | str): Repository object or full name (username/repo)
+
+    Returns:
+        int: Total number of contributors
     """
+    repo_full_name = repo if isinstance(repo, str) else repo.full_name
     try:
-        repo = github_actions.github.get_repo(repo_full_name)
-        contributors = repo.get_contributors()
-        try:
-            return contributors.totalCount
-        except:
-            count = 0
-            for _ in contributors:
-                count += 1
-            return count
+        with stage("contributor_count"):
+            return count_paginated_items(f"/repos/{repo_full_name}/contributors")
     except Exception as e:
+        count("github_errors")
         print(f"Error getting contributors for {repo_full_name}: {e}")
         return 0
 
 
+def fallback_project_details(repo_info):
+    """
+    Placeholder details for a repository the LLM could not describe
+
+    The result is marked with "fallback": True, so it is neither journaled nor
+    fingerprinted and the next run enriches the repository again.
+    """
+    repo_name = repo_info["name"]
+    repo_language = repo_info.get("language", "Unknown")
+    return {
+        "title": f"Enhanced {repo_name.replace('-', ' ').title()}",
+        "description": repo_info.get("description", "")
+        or f"A sophisticated {repo_language} project that demonstrates advanced programming skills and software development expertise. This project implements best practices in software architecture, with careful attention to code quality, performance, and user experience. The codebase showcases modular design patterns, efficient algorithms, and comprehensive error handling to ensure robustness in various scenarios. Throughout development, emphasis was placed on maintainability, extensibility, and clear documentation to facilitate collaboration and future enhancements. The project represents a significant achievement in software engineering, highlighting technical proficiency and problem-solving capabilities.",
+        "tags": f"{repo_language}, Software Development, Programming, Technical Excellence, Best Practices",
+        "project_status": "Active",
+        "license_type": "MIT",
+        "fallback": True,
+    }
+
+
 def generate_project_details(repo_info):
     """
     Generate enhanced title, description, tags, project status, and license type for a repository
@@ -135,177 +878,1245 @@ Format your response as a JSON object with these fields:
 Be descriptive, technical, and specific. If the original description is minimal, use your creativity to imagine what the project might do based on its name and language, while keeping the description plausible and professional.
 """
 
-    response = call_llm_api(prompt)
+    response = call_llm_api(prompt, accept=is_project_details)
+    metrics = getattr(_llm_call_metrics, "last", None)
+    if metrics and metrics["ttft"] is not None:
+        print(
+            f"Streamed {repo_name}: time to first token {metrics['ttft']:.2f}s, "
+            f"{metrics['tokens']} tokens at {metrics['tokens_per_second']:.1f} tokens/s"
+            f"{' (stopped after JSON object)' if metrics['stopped_early'] else ''}"
+        )
 
     try:
-        # Look for JSON object anywhere in the response
-        match = re.search(r"({[\s\S]*})", response, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-            enhanced_details = json.loads(json_str)
+        # Look for the first valid JSON object anywhere in the response
+        scanner = JSONObjectScanner(accept=is_project_details)
+        if scanner.feed(response) is not None:
+            enhanced_details = scanner.value
+            cache_llm_response()
             return enhanced_details
         else:
+            cache_llm_response(valid=False)
+            count("enrichment_fallbacks")
             print(f"No valid JSON found in response for {repo_name}")
-            # Create a fallback response
-            return {
-                "title": f"Enhanced {repo_name.replace('-', ' ').title()}",
-                "description": repo_description
-                or f"A sophisticated {repo_language} project that demonstrates advanced programming skills and software development expertise. This project implements best practices in software architecture, with careful attention to code quality, performance, and user experience. The codebase showcases modular design patterns, efficient algorithms, and comprehensive error handling to ensure robustness in various scenarios. Throughout development, emphasis was placed on maintainability, extensibility, and clear documentation to facilitate collaboration and future enhancements. The project represents a significant achievement in software engineering, highlighting technical proficiency and problem-solving capabilities.",
-                "tags": f"{repo_language}, Software Development, Programming, Technical Excellence, Best Practices",
-                "project_status": "Active",
-                "license_type": "MIT",
-            }
+            return fallback_project_details(repo_info)
     except Exception as e:
+        cache_llm_response(valid=False)
+        count("enrichment_fallbacks")
         print(f"Error parsing response for {repo_name}: {e}")
-        # Create a fallback response
-        return {
-            "title": f"Enhanced {repo_name.replace('-', ' ').title()}",
-            "description": repo_description
-            or f"A sophisticated {repo_language} project that demonstrates advanced programming skills and software development expertise. This project implements best practices in software architecture, with careful attention to code quality, performance, and user experience. The codebase showcases modular design patterns, efficient algorithms, and comprehensive error handling to ensure robustness in various scenarios. Throughout development, emphasis was placed on maintainability, extensibility, and clear documentation to facilitate collaboration and future enhancements. The project represents a significant achievement in software engineering, highlighting technical proficiency and problem-solving capabilities.",
-            "tags": f"{repo_language}, Software Development, Programming, Technical Excellence, Best Practices",
-            "project_status": "Active",
-            "license_type": "MIT",
-        }
+        return fallback_project_details(repo_info)
+
+
+def _batch_prompt(repo_infos):
+    """Build one prompt asking for enhanced details of several repositories"""
+    projects = "\n".join(f"""Project {i + 1}
+Repository Name: {repo_info["name"]}
+Original Description: {repo_info.get("description", "")}
+Primary Language: {repo_info.get("language", "Unknown")}
+Total Commits: {repo_info.get("commit_count", 0)}
+Total Contributors: {repo_info.get("contributors", 0)}
+License Info: {repo_info.get("license", "No License")}
+""" for i, repo_info in enumerate(repo_infos))
+    return f"""
+I need to create compelling project descriptions for my portfolio. Please enhance each of the following {len(repo_infos)} projects with a creative title, detailed description, and relevant tags, and also generate additional repository stats.
+
+{projects}
+For EACH project, please provide the following:
+
+1. A creative and professional title (not just the repository name)
+2. A detailed description that is AT LEAST 100 WORDS long. This description should thoroughly explain the project's purpose, technology highlights, challenges overcome, and key features. Make it sound impressive and professional.
+3. A list of 4-6 relevant technology tags based on the repository information.
+4. Project Status: Provide a status such as "Active", "Completed", "In Progress", etc. based on the repository's activity and commit count.
+5. License Type: Suggest a common open-source license type (e.g., MIT, GPL, Apache, etc.) that best fits the repository's nature.
+
+Format your response as a JSON array with exactly {len(repo_infos)} objects, one per project, in the same order. Each object must have these fields:
+[
+  {{
+    "repo_name": "Repository Name exactly as given",
+    "title": "Enhanced Title",
+    "description": "Detailed description that is at least 100 words long...",
+    "tags": "Tag1, Tag2, Tag3, Tag4, Tag5",
+    "project_status": "Active/Completed/In Progress",
+    "license_type": "MIT/GPL/Apache, etc."
+  }}
+]
+
+Be descriptive, technical, and specific. If the original description is minimal, use your creativity to imagine what the project might do based on its name and language, while keeping the description plausible and professional.
+"""
+
+
+def generate_batch_project_details(repo_infos):
+    """
+    Generate enhanced details for several repositories with a single LLM request
+
+    Results are matched back to repositories by the "repo_name" field. Items that
+    are missing or incomplete are retried one at a time with
+    generate_project_details.
+
+    Args:
+        repo_infos (list): Repository information dicts
+
+    Returns:
+        list: Enhanced project details, in the same order as repo_infos
+    """
+    if len(repo_infos) == 1:
+        return [generate_project_details(repo_infos[0])]
+
+    names = ", ".join(repo_info["name"] for repo_info in repo_infos)
+    print(f"Generating enhanced details for batch of {len(repo_infos)}: {names}...")
+    response = call_llm_api(
+        _batch_prompt(repo_infos),
+        max_tokens=min(LLM_BATCH_ITEM_TOKENS * len(repo_infos), LLM_BATCH_MAX_TOKENS),
+        expect="[",
+        accept=is_batch_details,
+    )
+
+    by_name = {}
+    scanner = JSONObjectScanner("[", is_batch_details)
+    if scanner.feed(response) is not None:
+        for item in scanner.value:
+            if isinstance(item, dict) and item.get("repo_name"):
+                by_name[str(item.pop("repo_name")).strip().lower()] = item
+    else:
+        print(f"No valid JSON array found in batch response for {names}")
+    found = [by_name.get(repo_info["name"].lower()) for repo_info in repo_infos]
+    complete = [is_project_details(details) for details in found]
+    # Only a response that covers the whole batch is worth replaying
+    cache_llm_response(valid=all(complete))
+
+    results = []
+    retried = 0
+    for repo_info, details, is_complete in zip(repo_infos, found, complete):
+        if not is_complete:
+            retried += 1
+            details = generate_project_details(repo_info)
+        results.append(details)
+    if retried:
+        count("batch_items_retried", retried)
+        print(
+            f"Retried {retried} of {len(repo_infos)} projects from batch individually"
+        )
+    return results
 
 
-def get_commit_count(github_actions, repo_full_name):
+def get_commit_count(github_actions, repo):
     """
     Get the total number of commits for a repository
 
     Args:
         github_actions (GitHubActions): GitHub actions instance
-        repo_full_name (str): Full name of the repository (username/repo)
+        repo (Repository | str): Repository object or full name (username/repo)
 
     Returns:
         int: Total number of commits
     """
+    repo_full_name = repo if isinstance(repo, str) else repo.full_name
     try:
-        repo = github_actions.github.get_repo(repo_full_name)
-        commits = repo.get_commits()
-        try:
-            return commits.totalCount
-        except:
-            print(f"Counting commits manually for {repo_full_name}...")
-            commit_count = 0
-            for _ in commits:
-                commit_count += 1
-                if commit_count >= 1000:
-                    print(f"Reached 1000 commits, stopping count for {repo_full_name}")
-                    break
-            return commit_count
+        with stage("commit_count"):
+            return count_paginated_items(f"/repos/{repo_full_name}/commits")
     except Exception as e:
+        count("github_errors")
         print(f"Error getting commit count for {repo_full_name}: {e}")
         return 0
 
 
-def get_user_repositories(github_actions):
+def collect_repo_info(github_actions, repo):
     """
-    Get all public repositories for the authenticated user and sort by commit count
+    Collect portfolio metadata for a single repository
 
     Args:
         github_actions (GitHubActions): GitHub actions instance
+        repo (Repository): Repository object from the repository listing
+
+    Returns:
+        tuple: (repo_info dict, seconds spent collecting it)
+    """
+    start = time.perf_counter()
+    repo_info = {
+        "name": repo.name,
+        "full_name": repo.full_name,
+        "description": repo.description,
+        "language": repo.language,
+        "url": repo.html_url,
+        "created_at": (repo.created_at.isoformat() if repo.created_at else None),
+        "updated_at": (repo.updated_at.isoformat() if repo.updated_at else None),
+        "stars": repo.stargazers_count,
+        "forks": repo.forks_count,
+        "commit_count": get_commit_count(github_actions, repo),
+        "contributors": get_contributors_count(github_actions, repo),
+        "license": (
+            repo.license.spdx_id
+            if repo.license and hasattr(repo.license, "spdx_id")
+            else "No License"
+        ),
+    }
+    return repo_info, time.perf_counter() - start
+
+
+def _graphql_timestamp(value):
+    """Normalize a GraphQL timestamp to the isoformat() used by the REST path"""
+    return value.replace("Z", "+00:00") if value else None
+
+
+def _graphql_repo_info(node):
+    """
+    Convert a repository node from REPOSITORIES_QUERY to a repo_info dict
+
+    Args:
+        node (dict): Repository node
 
     Returns:
-        list: User public repositories sorted by commit count
+        dict: Repository information (without contributors)
     """
+    branch = node.get("defaultBranchRef") or {}
+    history = (branch.get("target") or {}).get("history") or {}
+    license_info = node.get("licenseInfo") or {}
+    return {
+        "name": node["name"],
+        "full_name": node["nameWithOwner"],
+        "description": node.get("description"),
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "url": node["url"],
+        "created_at": _graphql_timestamp(node.get("createdAt")),
+        "updated_at": _graphql_timestamp(node.get("updatedAt")),
+        "stars": node.get("stargazerCount", 0),
+        "forks": node.get("forkCount", 0),
+        "commit_count": history.get("totalCount", 0),
+        "contributors": 0,
+        "license": license_info.get("spdxId") or "No License",
+    }
+
+
+def _collect_contributors(repo_info):
+    """Fill in the contributor count for a repo_info dict, timing the lookup"""
+    start = time.perf_counter()
     try:
-        user = github_actions.user.login
+        with stage("contributor_count"):
+            repo_info["contributors"] = count_paginated_items(
+                f"/repos/{repo_info['full_name']}/contributors"
+            )
+    except Exception as e:
+        count("github_errors")
+        print(f"Error getting contributors for {repo_info['full_name']}: {e}")
+    return repo_info, time.perf_counter() - start
+
+
+class AccountNotFoundError(LookupError):
+    """The requested GitHub user or organization does not exist"""
+
+    def __init__(self, login):
+        super().__init__(f"no GitHub user or organization named {login}")
+        self.login = login
+
+
+def collect_repositories_graphql(workers=1, owner=None):
+    """
+    Collect public repositories of the authenticated user with batched GraphQL queries
+
+    One query returns a page of repositories including license and default-branch
+    commit totals. GraphQL has no contributor count, so that is read with one
+    single-item REST request per repository.
+
+    Args:
+        workers (int): Number of contributor lookups to run concurrently
+        owner (str): User or organization to list instead of the authenticated user
+
+    Returns:
+        list: Repository information in listing order
+
+    Raises:
+        AccountNotFoundError: owner does not exist
+    """
+    user_repos = []
+    after = None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = []
+        while True:
+            variables = {"first": GITHUB_GRAPHQL_PAGE_SIZE, "after": after}
+            if owner:
+                variables["login"] = owner
+            with stage("github_listing_page"):
+                response = github_request(
+                    "POST",
+                    GITHUB_GRAPHQL_URL,
+                    json={
+                        "query": (
+                            OWNER_REPOSITORIES_QUERY if owner else REPOSITORIES_QUERY
+                        ),
+                        "variables": variables,
+                    },
+                )
+            result = response.json()
+            errors = result.get("errors") or []
+            if owner and any(error.get("type") == "NOT_FOUND" for error in errors):
+                raise AccountNotFoundError(owner)
+            if errors:
+                raise RuntimeError(errors[0].get("message", errors))
+            listing = result["data"]["repositoryOwner" if owner else "viewer"]
+            if listing is None:
+                raise AccountNotFoundError(owner)
+            repositories = listing["repositories"]
+            futures.extend(
+                executor.submit(_collect_contributors, _graphql_repo_info(node))
+                for node in repositories["nodes"]
+            )
+            if not repositories["pageInfo"]["hasNextPage"]:
+                break
+            after = repositories["pageInfo"]["endCursor"]
+
+        for future in futures:
+            repo_info, elapsed = future.result()
+            print(
+                f"Collected {repo_info['full_name']} in {elapsed:.2f}s "
+                f"({repo_info['commit_count']} commits)"
+            )
+            user_repos.append(repo_info)
+    return user_repos
+
+
+def collect_repositories_rest(github_actions, workers=1):
+    """
+    Collect public repositories of the authenticated user through the REST API
+
+    Args:
+        github_actions (GitHubActions): GitHub actions instance
+        workers (int): Number of repositories to collect concurrently (1 = sequential)
+
+    Returns:
+        list: Repository information in listing order
+    """
+    user = github_actions.user.login
+    repos = github_actions.user.get_repos()
+    user_repos = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Submit while the listing is still paging so collection overlaps it;
+        # futures are kept in listing order so ties sort exactly as before.
+        futures = [
+            executor.submit(collect_repo_info, github_actions, repo)
+            for repo in repos
+            if repo.owner.login == user and not repo.private
+        ]
+        for future in futures:
+            repo_info, elapsed = future.result()
+            print(
+                f"Collected {repo_info['full_name']} in {elapsed:.2f}s "
+                f"({repo_info['commit_count']} commits)"
+            )
+            user_repos.append(repo_info)
+    return user_repos
+
+
+def _rest_repo_info(data):
+    """Convert a repository from a REST listing to a repo_info dict (without counts)"""
+    license_info = data.get("license") or {}
+    return {
+        "name": data["name"],
+        "full_name": data["full_name"],
+        "description": data.get("description"),
+        "language": data.get("language"),
+        "url": data["html_url"],
+        "created_at": _graphql_timestamp(data.get("created_at")),
+        "updated_at": _graphql_timestamp(data.get("updated_at")),
+        "stars": data.get("stargazers_count", 0),
+        "forks": data.get("forks_count", 0),
+        "commit_count": 0,
+        "contributors": 0,
+        "license": license_info.get("spdx_id") or "No License",
+    }
+
+
+def _collect_counts(repo_info):
+    """Fill in the commit and contributor counts for a repo_info dict"""
+    start = time.perf_counter()
+    repo_info["commit_count"] = get_commit_count(None, repo_info["full_name"])
+    repo_info["contributors"] = get_contributors_count(None, repo_info["full_name"])
+    return repo_info, time.perf_counter() - start
+
+
+def collect_owner_repositories_rest(owner, workers=1):
+    """
+    Collect public repositories of any user or organization through the REST API
+
+    Args:
+        owner (str): User or organization login
+        workers (int): Number of repositories to collect concurrently (1 = sequential)
+
+    Returns:
+        list: Repository information in listing order
+
+    Raises:
+        AccountNotFoundError: owner does not exist
+    """
+    user_repos = []
+    url = f"/users/{owner}/repos"
+    params = {"type": "owner", "per_page": 100}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = []
+        while url:
+            with stage("github_listing_page"):
+                try:
+                    response = github_request("GET", url, params=params)
+                except requests.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 404:
+                        raise AccountNotFoundError(owner) from e
+                    raise
+            futures.extend(
+                executor.submit(_collect_counts, _rest_repo_info(data))
+                for data in response.json()
+                if not data.get("private")
+                and data["owner"]["login"].lower() == owner.lower()
+            )
+            # The next link already carries the query parameters
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+        for future in futures:
+            repo_info, elapsed = future.result()
+            print(
+                f"Collected {repo_info['full_name']} in {elapsed:.2f}s "
+                f"({repo_info['commit_count']} commits)"
+            )
+            user_repos.append(repo_info)
+    return user_repos
+
+
+def get_user_repositories(github_actions, workers=1, backend="graphql", owner=None):
+    """
+    Get all public repositories for the authenticated user and sort by commit count
+
+    Args:
+        github_actions (GitHubActions): GitHub actions instance (unused with owner)
+        workers (int): Number of repositories to collect concurrently (1 = sequential)
+        backend (str): "graphql" for batched queries, "rest" for per-repository calls
+        owner (str): User or organization to list instead of the authenticated user
+
+    Returns:
+        list: User public repositories sorted by commit count (empty on errors)
+
+    Raises:
+        AccountNotFoundError: owner does not exist
+    """
+    try:
+        user = owner or github_actions.user.login
         print(f"Fetching public repositories for user: {user}")
 
-        repos = github_actions.user.get_repos()
-        user_repos = []
-        print("Collecting repository information...")
-        for repo in repos:
-            if repo.owner.login == user and not repo.private:
-                print(f"Getting commit count for {repo.full_name}...")
-                commit_count = get_commit_count(github_actions, repo.full_name)
-                repo_info = {
-                    "name": repo.name,
-                    "full_name": repo.full_name,
-                    "description": repo.description,
-                    "language": repo.language,
-                    "url": repo.html_url,
-                    "created_at": (
-                        repo.created_at.isoformat() if repo.created_at else None
-                    ),
-                    "updated_at": (
-                        repo.updated_at.isoformat() if repo.updated_at else None
-                    ),
-                    "stars": repo.stargazers_count,
-                    "forks": repo.forks_count,
-                    "commit_count": commit_count,
-                    "contributors": get_contributors_count(
-                        github_actions, repo.full_name
-                    ),
-                    "license": (
-                        repo.license.spdx_id
-                        if repo.license and hasattr(repo.license, "spdx_id")
-                        else "No License"
-                    ),
-                }
-                user_repos.append(repo_info)
+        start = time.perf_counter()
+        requests_before = _github_request_count
+        user_repos = None
+        print(
+            f"Collecting repository information ({backend}, {max(1, workers)} workers)..."
+        )
+        if backend == "graphql":
+            try:
+                user_repos = collect_repositories_graphql(workers, owner)
+            except AccountNotFoundError:
+                raise
+            except Exception as e:
+                count("graphql_fallbacks")
+                print(f"GraphQL collection failed ({e}), falling back to REST")
+        if user_repos is None and owner:
+            user_repos = collect_owner_repositories_rest(owner, workers)
+        elif user_repos is None:
+            user_repos = collect_repositories_rest(github_actions, workers)
 
         # Sort repositories by commit count (descending)
         user_repos.sort(key=lambda x: x.get("commit_count", 0), reverse=True)
-        print(f"Found {len(user_repos)} public repositories, sorted by commit count:")
+        print(
+            f"Found {len(user_repos)} public repositories in "
+            f"{time.perf_counter() - start:.2f}s, sorted by commit count:"
+        )
+        if user_repos and _github_request_count > requests_before:
+            direct_requests = _github_request_count - requests_before
+            print(
+                f"Made {direct_requests} direct GitHub API requests "
+                f"({direct_requests / len(user_repos):.2f} per repository)"
+            )
+        if isinstance(_get_github_session(), CachedSession):
+            cache_stats = _get_github_session().stats()
+            print(
+                f"GitHub response cache: {cache_stats['hits']} hits, "
+                f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)"
+            )
         for repo in user_repos:
             print(f"- {repo['full_name']}: {repo['commit_count']} commits")
         return user_repos
 
+    except AccountNotFoundError:
+        raise
     except Exception as e:
         print(f"Error fetching repositories: {e}")
         return []
 
 
-def create_portfolio(repositories):
+FINGERPRINT_FIELDS = (
+    "name",
+    "description",
+    "language",
+    "commit_count",
+    "contributors",
+    "license",
+)
+ENHANCED_FIELDS = ("title", "description", "tags", "project_status", "license_type")
+# Fields an LLM response must contain to be used at all
+REQUIRED_FIELDS = ("title", "description")
+
+
+def repo_fingerprint(repo):
+    """
+    Hash the repository fields that feed the LLM prompt
+
+    Args:
+        repo (dict): Repository information
+
+    Returns:
+        str: Hex digest that changes whenever the enrichment inputs change
+    """
+    inputs = {field: repo.get(field) for field in FINGERPRINT_FIELDS}
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def load_previous_portfolio(output_file=OUTPUT_FILE, state_file=STATE_FILE):
+    """
+    Load the existing portfolio keyed by GitHub URL
+
+    Args:
+        output_file (str): Path to the existing projects JSON
+        state_file (str): Path to the fingerprint state written alongside it
+
+    Returns:
+        dict: GitHub URL -> {"project": project dict, "fingerprint": str or None}
+    """
+    try:
+        with open(output_file, "r") as f:
+            projects = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    try:
+        with open(state_file, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    previous = {}
+    for project in projects:
+        url = project.get("github")
+        if url:
+            previous[url] = {
+                "project": project,
+                "fingerprint": state.get(url, {}).get("fingerprint"),
+            }
+    return previous
+
+
+def _allocate_project_ids(repositories, previous):
+    """
+    Assign project ids, keeping the id of every repository seen before
+
+    Without a previous portfolio ids follow the commit-count order (proj1, proj2, ...).
+
+    Args:
+        repositories (list): Repository information
+        previous (dict): Result of load_previous_portfolio
+
+    Returns:
+        list: Project id for each repository
+    """
+    if not previous:
+        return [f"proj{i+1}" for i in range(len(repositories))]
+
+    used = {entry["project"]["id"] for entry in previous.values()}
+    next_number = 1
+    project_ids = []
+    for repo in repositories:
+        prior = previous.get(repo["url"])
+        if prior:
+            project_ids.append(prior["project"]["id"])
+            continue
+        while f"proj{next_number}" in used:
+            next_number += 1
+        used.add(f"proj{next_number}")
+        project_ids.append(f"proj{next_number}")
+    return project_ids
+
+
+def build_project(repo, project_id, enhanced_details):
+    """
+    Combine repository information and enriched details into a portfolio entry
+
+    Args:
+        repo (dict): Repository information
+        project_id (str): Project id, e.g. proj1
+        enhanced_details (dict): Result of generate_project_details
+
+    Returns:
+        dict: Portfolio project
+    """
+    image_filename = f"assets/{project_id}-800.webp"
+    alt_text = f"Artistic concept representing the {enhanced_details.get('title', repo['name'])} project"
+    return {
+        "id": project_id,
+        "title": enhanced_details.get("title", f"Enhanced {repo['name']}"),
+        "description": enhanced_details.get(
+            "description",
+            repo.get("description", "A software development project."),
+        ),
+        "image": image_filename,
+        "alt": alt_text,
+        "github": repo["url"],
+        "tags": enhanced_details.get(
+            "tags", repo.get("language", "Software Development")
+        ),
+        "commit_count": repo.get("commit_count", 0),
+        "contributors": repo.get("contributors", 0),
+        "project_status": enhanced_details.get("project_status", "Active"),
+        "license_type": enhanced_details.get("license_type", "MIT"),
+    }
+
+
+class EnrichmentJournal:
+    """
+    Append-only JSONL checkpoint with one record per enriched repository
+
+    Records are flushed and fsynced as soon as a repository is enriched, so an
+    interrupted run can be resumed without repeating finished LLM work.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, resume=False):
+        """
+        Args:
+            path (str): Journal file
+            resume (bool): Keep and load existing records instead of starting over
+        """
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        if resume:
+            try:
+                with open(path, "r") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # A torn final line from a crash mid-write
+                            continue
+                        self.records[record["url"]] = record
+            except OSError:
+                pass
+            print(f"Loaded {len(self.records)} enriched repositories from {path}")
+        self._file = open(path, "a" if resume else "w")
+
+    def lookup(self, repo):
+        """
+        Return journaled details for a repository whose inputs have not changed
+
+        Args:
+            repo (dict): Repository information
+
+        Returns:
+            dict: Enhanced details, or None if the repository must be enriched
+        """
+        record = self.records.get(repo["url"])
+        if record and record["fingerprint"] == repo_fingerprint(repo):
+            return record["details"]
+        return None
+
+    def record(self, repo, details):
+        """
+        Durably append the enriched details of one repository
+
+        Args:
+            repo (dict): Repository information
+            details (dict): Enhanced details
+        """
+        record = {
+            "url": repo["url"],
+            "fingerprint": repo_fingerprint(repo),
+            "details": details,
+        }
+        with self._lock:
+            if self._file.closed:
+                # A batch finishing after an interrupt closed the journal
+                return
+            self.records[repo["url"]] = record
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self, remove=False):
+        """
+        Close the journal
+
+        Args:
+            remove (bool): Delete the journal, e.g. after the output was written
+        """
+        with self._lock:
+            self._file.close()
+        if remove:
+            os.remove(self.path)
+
+
+def _enrich_batch(repo_infos, journal=None):
+    """Enrich a batch of repositories and checkpoint each result in the journal"""
+    with stage("llm_enrichment"):
+        results = generate_batch_project_details(repo_infos)
+    if journal is not None:
+        for repo_info, details in zip(repo_infos, results):
+            # Placeholders are not checkpointed, so --resume retries them
+            if not details.get("fallback"):
+                journal.record(repo_info, details)
+    return results
+
+
+def create_portfolio(
+    repositories,
+    previous=None,
+    concurrency=1,
+    batch_size=1,
+    journal=None,
+    on_project=None,
+):
     """
     Create portfolio data structure from repositories
 
     Args:
         repositories (list): Repository information
+        previous (dict): Result of load_previous_portfolio; repositories whose
+            fingerprint is unchanged reuse their enriched details and id
+        concurrency (int): Number of LLM requests to run at the same time
+        batch_size (int): Number of repositories enriched per LLM request
+        journal (EnrichmentJournal): Checkpoint to resume from and record into
+        on_project (callable): Called with (index, project) as soon as each
+            project is ready, in completion order; may block to apply backpressure
 
     Returns:
-        list: Portfolio projects
+        list: Portfolio projects, in the same order as repositories
     """
-    portfolio_projects = []
+    previous = previous or {}
+    project_ids = _allocate_project_ids(repositories, previous)
+    details = [None] * len(repositories)
+    to_enrich = []
+    resumed = 0
     for i, repo in enumerate(repositories):
-        project_id = f"proj{i+1}"
-        enhanced_details = generate_project_details(repo)
-        image_filename = f"assets/{project_id}-800.webp"
-        alt_text = f"Artistic concept representing the {enhanced_details.get('title', repo['name'])} project"
-        project = {
-            "id": project_id,
-            "title": enhanced_details.get("title", f"Enhanced {repo['name']}"),
-            "description": enhanced_details.get(
-                "description",
-                repo.get("description", "A software development project."),
+        prior = previous.get(repo["url"])
+        journaled = journal.lookup(repo) if journal is not None else None
+        if journaled is not None:
+            details[i] = journaled
+            resumed += 1
+            count("skipped_journaled")
+        elif prior and prior["fingerprint"] == repo_fingerprint(repo):
+            count("skipped_unchanged")
+            print(f"Reusing details for unchanged repository {repo['name']}")
+            details[i] = {
+                field: prior["project"][field]
+                for field in ENHANCED_FIELDS
+                if field in prior["project"]
+            }
+        else:
+            if previous:
+                reason = "new repository" if prior is None else "inputs changed"
+                print(f"Enriching {repo['name']}: {reason}")
+            to_enrich.append(i)
+    if resumed:
+        print(f"Resuming: {resumed} repositories already enriched in the journal")
+
+    batch_size = max(1, batch_size)
+    batches = [
+        to_enrich[i : i + batch_size] for i in range(0, len(to_enrich), batch_size)
+    ]
+    portfolio_projects = []
+    start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {
+            executor.submit(
+                _enrich_batch, [repositories[i] for i in batch], journal
+            ): batch
+            for batch in batches
+        }
+        batch_of = {i: future for future, batch in futures.items() for i in batch}
+
+        if on_project is not None:
+            # Hand projects over as they become ready: reused ones first, then
+            # each batch as soon as it is enriched
+            for i, repo in enumerate(repositories):
+                if details[i] is not None:
+                    on_project(i, build_project(repo, project_ids[i], details[i]))
+            for future in as_completed(futures):
+                for i, batch_details in zip(futures[future], future.result()):
+                    on_project(
+                        i, build_project(repositories[i], project_ids[i], batch_details)
+                    )
+
+        # Assemble in repository order, waiting on each batch as it is needed
+        for i, (repo, project_id) in enumerate(zip(repositories, project_ids)):
+            if details[i] is None:
+                future = batch_of[i]
+                batch = futures[future]
+                details[i] = future.result()[batch.index(i)]
+            project = build_project(repo, project_id, details[i])
+            # Read by save_portfolio, so placeholders are not reused next run
+            repo["enrichment_fallback"] = bool(details[i].get("fallback"))
+            portfolio_projects.append(project)
+            print(
+                f"Added {project['title']} to portfolio (Commits: {repo.get('commit_count', 0)})"
+            )
+    except BaseException:
+        # Do not start queued batches after an interrupt; finished ones are journaled
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    enriched = len(to_enrich)
+    if previous:
+        print(
+            f"Enriched {enriched} new or changed repositories, "
+            f"reused {len(repositories) - enriched} unchanged ones"
+        )
+    if enriched and elapsed > 0:
+        print(
+            f"Enrichment throughput: {enriched / elapsed * 60:.1f} projects/min "
+            f"({enriched} projects in {elapsed:.1f}s, concurrency {max(1, concurrency)}, "
+            f"batch size {batch_size})"
+        )
+    return portfolio_projects
+
+
+def write_bytes_atomic(path, data):
+    """
+    Write a file so readers see either the old file or the complete new one
+
+    The data is written to a temporary file in the same directory, fsynced and
+    then renamed over the destination.
+
+    Args:
+        path (str): Destination file
+        data (bytes): File contents
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        # mkstemp creates 0600 files; published output must stay world-readable
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """
+    Write JSON atomically (see write_bytes_atomic)
+
+    Args:
+        path (str): Destination file
+        data: JSON-serializable data
+        **dump_kwargs: Extra arguments passed to json.dumps
+    """
+    write_bytes_atomic(path, json.dumps(data, **dump_kwargs).encode())
+
+
+def _content_etag(data):
+    """Strong ETag derived from the file contents"""
+    return f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+
+
+def write_static_json(path, data):
+    """
+    Write minified JSON plus pre-compressed .gz and .br siblings
+
+    Files whose contents are unchanged are left untouched so their modification
+    times (and any HTTP caches keyed on them) stay valid.
+
+    Args:
+        path (str): Destination file
+        data: JSON-serializable data
+
+    Returns:
+        str: Content-hash ETag of the uncompressed JSON
+    """
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    variants = {path: raw, f"{path}.gz": gzip.compress(raw, 9, mtime=0)}
+    if brotli is not None:
+        variants[f"{path}.br"] = brotli.compress(raw, quality=11)
+    for variant_path, content in variants.items():
+        try:
+            with open(variant_path, "rb") as f:
+                if f.read() == content:
+                    continue
+        except OSError:
+            pass
+        write_bytes_atomic(variant_path, content)
+    return _content_etag(raw)
+
+
+def _summary(description, limit=160):
+    """First sentence of a description, cut at a word boundary"""
+    sentence = re.split(r"(?<=[.!?])\s", description or "", maxsplit=1)[0]
+    if len(sentence) <= limit:
+        return sentence
+    return sentence[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def write_paginated_output(
+    portfolio_projects, pages_dir=PAGES_DIR, page_size=PAGE_SIZE, output_dir="."
+):
+    """
+    Write the page shards, summary and index read by project-loader.js
+
+    Layout under pages_dir:
+        index.json     total, page size, URL + ETag of every file below, and
+                       the first page inline so the first paint is one request
+        page-N.json    page_size full projects per page, N starting at 1
+        summary.json   every project without its full description
+        all.json       every project, minified
+    Every file also gets .gz (and .br when brotli is installed) siblings.
+
+    Args:
+        portfolio_projects (list): Portfolio projects
+        pages_dir (str): Output directory, relative to output_dir (also the URL prefix)
+        page_size (int): Projects per page
+        output_dir (str): Site root the shards are written under
+    """
+    url_prefix = pages_dir
+    pages_dir = os.path.join(output_dir, pages_dir)
+    os.makedirs(pages_dir, exist_ok=True)
+    page_size = max(1, page_size)
+    pages = []
+    first_page = portfolio_projects[:page_size]
+    for number, start in enumerate(
+        range(0, len(portfolio_projects), page_size), start=1
+    ):
+        page = portfolio_projects[start : start + page_size]
+        name = f"page-{number}.json"
+        etag = write_static_json(os.path.join(pages_dir, name), page)
+        pages.append({"url": f"{url_prefix}/{name}", "count": len(page), "etag": etag})
+
+    # Drop page shards left over from a run with more projects
+    for name in os.listdir(pages_dir):
+        match = re.fullmatch(r"page-(\d+)\.json(\.gz|\.br)?", name)
+        if match and int(match.group(1)) > len(pages):
+            os.remove(os.path.join(pages_dir, name))
+
+    summary = [
+        {
+            **{field: project[field] for field in SUMMARY_FIELDS if field in project},
+            "summary": _summary(project.get("description")),
+        }
+        for project in portfolio_projects
+    ]
+    index = {
+        "total": len(portfolio_projects),
+        "page_size": page_size,
+        "pages": pages,
+        "first_page": first_page,
+        "summary": {
+            "url": f"{url_prefix}/summary.json",
+            "etag": write_static_json(os.path.join(pages_dir, "summary.json"), summary),
+        },
+        "all": {
+            "url": f"{url_prefix}/all.json",
+            "etag": write_static_json(
+                os.path.join(pages_dir, "all.json"), portfolio_projects
             ),
-            "image": image_filename,
-            "alt": alt_text,
-            "github": repo["url"],
-            "tags": enhanced_details.get(
-                "tags", repo.get("language", "Software Development")
+        },
+    }
+    write_static_json(os.path.join(pages_dir, "index.json"), index)
+    compression = "gzip and brotli" if brotli is not None else "gzip"
+    print(
+        f"Wrote {len(pages)} pages of {page_size} projects to {pages_dir}/ "
+        f"(minified, pre-compressed with {compression})"
+    )
+
+
+def save_portfolio(portfolio_projects, repositories, output_dir="."):
+    """
+    Write projects.json and the fingerprint state used by --incremental
+
+    Args:
+        portfolio_projects (list): Portfolio projects
+        repositories (list): Repository information, in the same order
+        output_dir (str): Directory to write both files to
+    """
+    write_json_atomic(
+        os.path.join(output_dir, OUTPUT_FILE), portfolio_projects, indent=2
+    )
+
+    # Placeholder details get no fingerprint, so --incremental enriches them again
+    state = {
+        project["github"]: {
+            "id": project["id"],
+            "fingerprint": (
+                None if repo.get("enrichment_fallback") else repo_fingerprint(repo)
             ),
-            "commit_count": repo.get("commit_count", 0),
-            "contributors": repo.get("contributors", 0),
-            "project_status": enhanced_details.get("project_status", "Active"),
-            "license_type": enhanced_details.get("license_type", "MIT"),
         }
-        portfolio_projects.append(project)
+        for project, repo in zip(portfolio_projects, repositories)
+    }
+    write_json_atomic(os.path.join(output_dir, STATE_FILE), state, indent=2)
+
+
+ACCOUNT_LOGIN = re.compile(r"[A-Za-z0-9][A-Za-z0-9-]{0,38}")
+
+
+def load_accounts(accounts=None, accounts_file=None):
+    """
+    Read the accounts of a batch run
+
+    Args:
+        accounts (str): Comma-separated user or organization logins
+        accounts_file (str): File with one login per line (# starts a comment)
+
+    Returns:
+        list: Unique logins in the order given
+
+    Raises:
+        ValueError: A login is not a valid GitHub login
+    """
+    logins = (accounts or "").split(",")
+    if accounts_file:
+        with open(accounts_file, "r") as f:
+            logins += [line.split("#", 1)[0] for line in f]
+    unique = []
+    for login in (login.strip() for login in logins):
+        if not login or login in unique:
+            continue
+        if not ACCOUNT_LOGIN.fullmatch(login):
+            raise ValueError(f"Invalid GitHub login: {login!r}")
+        unique.append(login)
+    return unique
+
+
+def parse_num_repos(value, total):
+    """
+    Number of top repositories selected by a --num_repos value
+
+    Args:
+        value (str): 'all', empty, or a count
+        total (int): Number of repositories found
+
+    Returns:
+        int: Count clamped to 1..total
+
+    Raises:
+        ValueError: value is neither 'all' nor a number
+    """
+    if value.lower() == "all" or not value.strip():
+        return total
+    return max(1, min(int(value), total))
+
+
+def build_account_portfolio(login, args, output_dir):
+    """
+    Collect, enrich and write the portfolio of one account into its own directory
+
+    Args:
+        login (str): User or organization login
+        args (Namespace): Parsed command line arguments
+        output_dir (str): Directory for projects.json, its state, journal and shards
+
+    Returns:
+        dict: Projects written, repositories found and seconds taken
+    """
+    start = time.perf_counter()
+    with stage("github_listing"):
+        repositories = get_user_repositories(
+            None, workers=args.workers, backend=args.backend, owner=login
+        )
+    if not repositories:
+        raise RuntimeError("no public repositories found")
+    num_repos = parse_num_repos(args.num_repos or "all", len(repositories))
+    selected = repositories[:num_repos]
+
+    os.makedirs(output_dir, exist_ok=True)
+    previous = None
+    if args.incremental:
+        previous = load_previous_portfolio(
+            os.path.join(output_dir, OUTPUT_FILE),
+            os.path.join(output_dir, STATE_FILE),
+        )
+    journal = EnrichmentJournal(
+        os.path.join(output_dir, JOURNAL_FILE), resume=args.resume
+    )
+    written = False
+    try:
+        portfolio_projects = create_portfolio(
+            selected,
+            previous,
+            concurrency=args.llm_concurrency,
+            batch_size=args.batch_size,
+            journal=journal,
+        )
+        with stage("write_output"):
+            save_portfolio(portfolio_projects, selected, output_dir)
+            write_paginated_output(
+                portfolio_projects, page_size=args.page_size, output_dir=output_dir
+            )
+        written = True
+    finally:
+        # The journal is kept for --resume unless the output was written
+        journal.close(remove=written)
+    return {
+        "projects": len(selected),
+        "repositories": len(repositories),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def print_llm_cache_stats():
+    """Print the hit rate of the LLM completion cache, if enabled"""
+    if _llm_cache is not None:
+        cache_stats = _llm_cache.stats()
         print(
-            f"Added {project['title']} to portfolio (Commits: {repo.get('commit_count', 0)})"
+            f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate), saved "
+            f"{cache_stats['saved_seconds']:.1f}s of inference"
         )
-    return portfolio_projects
 
 
-def main():
-    """Main function"""
+def run_batch(args, accounts):
+    """
+    Build the portfolios of several accounts concurrently, one directory each
+
+    All accounts share the GitHub rate-limit budget, the HTTP and LLM caches
+    and the LLM session.
+
+    Args:
+        args (Namespace): Parsed command line arguments
+        accounts (list): User or organization logins
+
+    Returns:
+        dict: login -> result of build_account_portfolio, or {"error": message}
+    """
+    start = time.perf_counter()
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, args.account_workers))
+    try:
+        futures = {
+            executor.submit(
+                build_account_portfolio,
+                login,
+                args,
+                os.path.join(args.output_root, login),
+            ): login
+            for login in accounts
+        }
+        for future in as_completed(futures):
+            login = futures[future]
+            try:
+                results[login] = future.result()
+                print(
+                    f"Finished {login}: {results[login]['projects']} projects "
+                    f"in {results[login]['seconds']:.1f}s"
+                )
+            except Exception as e:
+                count("account_errors")
+                results[login] = {"error": str(e)}
+                print(f"Failed {login}: {e}")
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'account':<30} {'projects':>8} {'seconds':>8}")
+    for login in accounts:
+        result = results[login]
+        if "error" in result:
+            print(f"{login:<30} {'failed':>8}  {result['error']}")
+        else:
+            print(f"{login:<30} {result['projects']:>8} {result['seconds']:>8.1f}")
+    rate_stats = _rate_limit.stats()
+    if rate_stats["remaining"]:
+        remaining = ", ".join(f"{k} {v}" for k, v in rate_stats["remaining"].items())
+        print(f"GitHub rate limit remaining: {remaining}")
+    if rate_stats["waits"]:
+        print(
+            f"Requests waited {rate_stats['waited_seconds']:.1f}s in total for "
+            f"rate-limit resets ({rate_stats['waits']} waits)"
+        )
+    print_llm_cache_stats()
+    built = sum(1 for result in results.values() if "error" not in result)
+    print(
+        f"\nBuilt {built} of {len(accounts)} portfolios in {elapsed:.1f}s "
+        f"({max(1, args.account_workers)} accounts at a time) under {args.output_root}/"
+    )
+    return results
+
+
+def main(argv=None, on_project=None):
+    """
+    Main function
+
+    Args:
+        argv (list): Command-line arguments (default: sys.argv)
+        on_project (callable): Passed on to create_portfolio
+
+    Returns:
+        list: Portfolio projects written, or None if nothing was written
+            (in batch mode, the per-account results of run_batch)
+    """
+    args = parse_args(argv)
+    batch = bool(args.accounts or args.accounts_file)
+
     if not GITHUB_TOKEN:
         print("Error: GITHUB_TOKEN environment variable is not set")
         return
 
+    report = start_report("portfolio")
+    if args.profile_stage:
+        report.enable_profiling(args.profile_stage, args.profiler)
+    report.info.update(
+        backend=args.backend,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        batch_size=args.batch_size,
+        stream=args.stream,
+    )
+
+    init_github_session(use_cache=not args.no_http_cache)
+    init_llm_cache(enabled=not args.no_llm_cache, ttl_hours=args.llm_cache_ttl)
+    # --llm_concurrency applies per account
+    pool_size = args.llm_concurrency * (max(1, args.account_workers) if batch else 1)
+    init_llm_session(pool_size=pool_size, timeout=args.llm_timeout, stream=args.stream)
+
+    if batch:
+        try:
+            accounts = load_accounts(args.accounts, args.accounts_file)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return None
+        report.info.update(accounts=accounts, account_workers=args.account_workers)
+        try:
+            results = run_batch(args, accounts)
+        except KeyboardInterrupt:
+            print(
+                f"\nInterrupted. Enriched repositories are journaled in each account's "
+                f"directory under {args.output_root}/; run again with --resume to continue."
+            )
+            report.info["interrupted"] = True
+            print(f"Run report written to {report.write(args.report)}")
+            return None
+        report.info["results"] = results
+        report.print_summary()
+        print(f"Run report written to {report.write(args.report)}")
+        return results
+
+    # Imported here so the module can be used (e.g. by the benchmarks) without
+    # the GitHub Actions wrapper installed
+    from actions import GitHubActions
+
     github = GitHubActions(GITHUB_TOKEN)
-    repositories = get_user_repositories(github)
+    with stage("github_listing"):
+        repositories = get_user_repositories(
+            github, workers=args.workers, backend=args.backend
+        )
 
     if not repositories:
         print("No repositories found")
@@ -313,29 +2124,59 @@ def main():
 
     print(f"Found {len(repositories)} repositories")
     try:
-        num_repos_input = input(
-            f"How many repositories to include? (1-{len(repositories)} or 'all', default: all): "
-        )
+        if args.num_repos is not None:
+            num_repos_input = args.num_repos
+        else:
+            num_repos_input = input(
+                f"How many repositories to include? (1-{len(repositories)} or 'all', default: all): "
+            )
 
-        if num_repos_input.lower() == "all" or not num_repos_input.strip():
-            num_repos = len(repositories)
+        num_repos = parse_num_repos(num_repos_input, len(repositories))
+        if num_repos == len(repositories):
             print(f"Including all {num_repos} repositories")
         else:
-            num_repos = int(num_repos_input)
-            num_repos = max(1, min(num_repos, len(repositories)))
             print(f"Including top {num_repos} repositories by commit count")
     except ValueError:
         num_repos = len(repositories)
         print(f"Invalid input. Using default: all {num_repos} repositories")
 
     selected_repos = repositories[:num_repos]
-    portfolio_projects = create_portfolio(selected_repos)
-
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(portfolio_projects, f, indent=2)
+    report.info.update(repositories=len(repositories), selected=num_repos)
+    previous = load_previous_portfolio() if args.incremental else None
+    journal = EnrichmentJournal(JOURNAL_FILE, resume=args.resume)
+    written = False
+    try:
+        portfolio_projects = create_portfolio(
+            selected_repos,
+            previous,
+            concurrency=args.llm_concurrency,
+            batch_size=args.batch_size,
+            journal=journal,
+            on_project=on_project,
+        )
+        with stage("write_output"):
+            save_portfolio(portfolio_projects, selected_repos)
+            write_paginated_output(portfolio_projects, page_size=args.page_size)
+        written = True
+    except KeyboardInterrupt:
+        print(
+            f"\nInterrupted. {len(journal.records)} enriched repositories are saved in "
+            f"{JOURNAL_FILE}; run again with --resume to continue."
+        )
+        report.info["interrupted"] = True
+        print(f"Run report written to {report.write(args.report)}")
+        return None
+    finally:
+        # The journal is kept for --resume unless the output was written
+        journal.close(remove=written)
 
     print(f"\nPortfolio created successfully with {len(portfolio_projects)} projects!")
     print(f"Saved to {OUTPUT_FILE}")
+    print_llm_cache_stats()
+
+    report.print_summary()
+    print(f"Run report written to {report.write(args.report)}")
+    return portfolio_projects
 
 
 if __name__ == "__main__":
@@ -1,3 +1,18 @@
+// Responsive variants written by generate_portfolio_images.py (image -> srcset)
+let srcsetManifestPromise = null;
+
+function fetchSrcsetManifest() {
+  if (!srcsetManifestPromise) {
+    srcsetManifestPromise = fetch("assets/srcset.json")
+      .then((response) => (response.ok ? response.json() : {}))
+      .catch(() => ({}));
+  }
+  return srcsetManifestPromise;
+}
+
+// Start loading the manifest before the first card is created
+fetchSrcsetManifest();
+
 class ProjectCard extends HTMLElement {
   constructor() {
     super();
@@ -310,6 +325,8 @@ class ProjectCard extends HTMLElement {
 
     // Initial theme variables setup
     this.updateThemeVariables();
+
+    this.updateResponsiveImage();
   }
 
   // Disconnect observer when element is removed
@@ -383,6 +400,7 @@ class ProjectCard extends HTMLElement {
           case "image":
             if (imgEl) imgEl.src = newValue.replace(".webp", ".jpg");
             if (srcEl) srcEl.srcset = newValue;
+            this.updateResponsiveImage();
             break;
           case "alt":
             if (imgEl) imgEl.alt = newValue;
@@ -415,6 +433,25 @@ class ProjectCard extends HTMLElement {
     }
   }
 
+  // Let the browser pick a smaller variant on narrow screens when the srcset manifest lists one
+  updateResponsiveImage() {
+    const imageUrl = this.getAttribute("image");
+    if (!imageUrl) return;
+    fetchSrcsetManifest().then((manifest) => {
+      const srcEl = this.shadowRoot.querySelector("source");
+      // Skip if the image changed while the manifest was loading
+      if (
+        !srcEl ||
+        !manifest[imageUrl] ||
+        this.getAttribute("image") !== imageUrl
+      )
+        return;
+      // The image spans the card on mobile and 40% of it on desktop
+      srcEl.sizes = "(max-width: 768px) 100vw, 40vw";
+      srcEl.srcset = manifest[imageUrl];
+    });
+  }
+
   // NEW helper method to update meta information using the new span structure and status styling
   updateMeta() {
     const commitCount = this.getAttribute("commit_count") || "";
@@ -78,18 +78,69 @@ function loadProjectsFromLocalStorage() {
   }
 }
 
-function fetchPartialRemoteProjects(start, count) {
-  return fetch("projects.json")
-    .then((response) => {
+// Index of the page shards written by portfolio.py (fetched at most once)
+let projectsIndexPromise = null;
+
+function fetchProjectsIndex() {
+  if (!projectsIndexPromise) {
+    projectsIndexPromise = fetch("projects/index.json").then((response) => {
       if (!response.ok) {
         throw new Error("Network response was not ok");
       }
       return response.json();
+    });
+    // Allow a retry on the next call if the index is missing
+    projectsIndexPromise.catch(() => {
+      projectsIndexPromise = null;
+    });
+  }
+  return projectsIndexPromise;
+}
+
+// Content-hash ETags make every shard URL unique per version, so they can be
+// cached for a long time
+function versionedUrl(entry) {
+  return `${entry.url}?v=${entry.etag.replace(/"/g, "")}`;
+}
+
+function fetchJson(url) {
+  return fetch(url).then((response) => {
+    if (!response.ok) {
+      throw new Error("Network response was not ok");
+    }
+    return response.json();
+  });
+}
+
+function fetchPartialRemoteProjects(start, count) {
+  return fetchProjectsIndex()
+    .then((index) => {
+      // Fetch only the page shards covering [start, start + count)
+      const firstPage = Math.floor(start / index.page_size);
+      const lastPage = Math.min(
+        Math.floor((start + count - 1) / index.page_size),
+        index.pages.length - 1,
+      );
+      const pages = index.pages.slice(firstPage, lastPage + 1);
+      // The first page is embedded in the index, so the first paint needs no
+      // further request
+      const shards = pages.map((page, i) =>
+        firstPage + i === 0 && index.first_page
+          ? Promise.resolve(index.first_page)
+          : fetchJson(versionedUrl(page)),
+      );
+      return Promise.all(shards).then((loaded) => {
+        const offset = start - firstPage * index.page_size;
+        return loaded.flat().slice(offset, offset + count);
+      });
     })
-    .then((allProjects) => {
-      // Return just the slice of projects we want
-      return allProjects.slice(start, start + count);
-    })
+    .catch(() =>
+      // Fall back to the single file when no page shards are published
+      fetchJson("projects.json").then((allProjects) =>
+        // Return just the slice of projects we want
+        allProjects.slice(start, start + count),
+      ),
+    )
     .catch((error) => {
       console.error("Error fetching partial projects:", error);
       return [];
@@ -97,14 +148,10 @@ function fetchPartialRemoteProjects(start, count) {
 }
 
 function fetchRemoteProjects() {
-  // Fetch all projects from the JSON file
-  return fetch("projects.json")
-    .then((response) => {
-      if (!response.ok) {
-        throw new Error("Network response was not ok");
-      }
-      return response.json();
-    })
+  // Fetch all projects, preferring the minified versioned copy
+  return fetchProjectsIndex()
+    .then((index) => fetchJson(versionedUrl(index.all)))
+    .catch(() => fetchJson("projects.json"))
     .catch((error) => {
       console.error("Error fetching projects.json:", error);
       // Fallback to empty array if fetch fails
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub rate-limit budget following the X-RateLimit-* response headers.
+
+GitHub gives every token a request budget per resource (core REST, graphql,
+...) that is refilled in full when its window resets. RateLimitBudget keeps
+one token bucket per resource for all threads of the process. Every response
+resynchronizes the bucket from X-RateLimit-Remaining and X-RateLimit-Reset.
+When a bucket is down to its reserve, requests wait for the reset instead of
+running into 403 responses.
+"""
+
+import time
+import threading
+
+
+class RateLimitBudget:
+    """Token buckets, one per GitHub rate-limit resource, shared across threads"""
+
+    def __init__(self, reserve=10, max_wait=3600.0):
+        """
+        Args:
+            reserve (int): Requests left untouched in every bucket (for other tools
+                sharing the token and for requests already in flight)
+            max_wait (float): Longest single wait for a reset, in seconds
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self._buckets = {}
+        self._condition = threading.Condition()
+
+    def _bucket(self, resource):
+        # Unknown budgets are not limited until the first response reports them
+        return self._buckets.setdefault(
+            resource, {"limit": None, "tokens": float("inf"), "reset": None}
+        )
+
+    def acquire(self, resource="core"):
+        """
+        Take one request from a resource's bucket, waiting for its reset if empty
+
+        Args:
+            resource (str): Rate-limit resource, e.g. "core" or "graphql"
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        with self._condition:
+            while True:
+                bucket = self._bucket(resource)
+                now = time.time()
+                if bucket["reset"] is not None and now >= bucket["reset"]:
+                    # New window: refill until a response reports the real count
+                    bucket["tokens"] = (
+                        float("inf") if bucket["limit"] is None else bucket["limit"]
+                    )
+                    bucket["reset"] = None
+                if bucket["tokens"] > self.reserve:
+                    bucket["tokens"] -= 1
+                    break
+                delay = 1.0 if bucket["reset"] is None else bucket["reset"] - now + 1
+                delay = min(max(delay, 0.1), self.max_wait)
+                if not waited:
+                    self.waits += 1
+                    print(
+                        f"GitHub {resource} rate limit nearly used up, "
+                        f"waiting {delay:.0f}s for the reset"
+                    )
+                start = time.perf_counter()
+                self._condition.wait(delay)
+                waited += time.perf_counter() - start
+            self.waited_seconds += waited
+        return waited
+
+    def update(self, headers, resource=None):
+        """
+        Resynchronize a bucket from the rate-limit headers of a response
+
+        Args:
+            headers (Mapping): Response headers (case-insensitive)
+            resource (str): Resource the request counted against, used when the
+                response has no X-RateLimit-Resource header
+        """
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            limit = int(headers.get("X-RateLimit-Limit", remaining))
+            reset = float(headers.get("X-RateLimit-Reset", time.time() + 3600))
+        except (KeyError, TypeError, ValueError):
+            return
+        resource = headers.get("X-RateLimit-Resource") or resource or "core"
+        with self._condition:
+            bucket = self._bucket(resource)
+            if bucket["reset"] is None or reset > bucket["reset"]:
+                # First report, or a new window
+                bucket["tokens"] = remaining
+            else:
+                # Requests still in flight were taken from the bucket already
+                bucket["tokens"] = min(bucket["tokens"], remaining)
+            bucket["limit"] = limit
+            bucket["reset"] = reset
+            self._condition.notify_all()
+
+    def exhausted(self, resource, reset):
+        """Mark a bucket empty until reset (after a rate-limited response)"""
+        with self._condition:
+            bucket = self._bucket(resource)
+            bucket["tokens"] = 0
+            bucket["reset"] = max(reset, bucket["reset"] or 0)
+
+    def stats(self):
+        """Remaining requests per resource and time spent waiting"""
+        with self._condition:
+            return {
+                "remaining": {
+                    name: bucket["tokens"]
+                    for name, bucket in sorted(self._buckets.items())
+                    if bucket["limit"] is not None
+                },
+                "waits": self.waits,
+                "waited_seconds": self.waited_seconds,
+            }
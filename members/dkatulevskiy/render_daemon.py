@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local render daemon that keeps a loaded image pipeline resident between runs.
+
+Clients talk to it over a Unix socket with newline-delimited JSON. A request
+carries the model id and a list of image plans (project id, prompt, style,
+seed, size, ...); the reply holds the rendered images as raw RGB pixels, and
+the client encodes and saves them itself. Requests are rendered one at a time
+since they share a single pipeline.
+"""
+
+import os
+import json
+import base64
+import socket
+import threading
+import socketserver
+from PIL import Image
+
+
+def _encode_image(image):
+    image = image.convert("RGB")
+    return {
+        "size": list(image.size),
+        "data": base64.b64encode(image.tobytes()).decode("ascii"),
+    }
+
+
+def _decode_image(payload):
+    return Image.frombytes(
+        "RGB", tuple(payload["size"]), base64.b64decode(payload["data"])
+    )
+
+
+def _socket_in_use(socket_path):
+    """True if something is accepting connections on socket_path"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class _RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.handle_request_payload(json.loads(line))
+            except Exception as e:
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+            self.wfile.flush()
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server rendering plans with one resident pipeline"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, model_id, render):
+        """
+        Args:
+            socket_path (str): Path of the Unix socket to listen on
+            model_id (str): Model the pipeline was loaded from; requests for
+                other models are refused
+            render (callable): Takes a list of plans and returns PIL images
+        """
+        if os.path.exists(socket_path):
+            if _socket_in_use(socket_path):
+                raise OSError(f"A render daemon is already listening on {socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+        if os.path.dirname(socket_path):
+            os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        self.socket_path = socket_path
+        self.model_id = model_id
+        self.render = render
+        self.images_rendered = 0
+        self._render_lock = threading.Lock()
+        super().__init__(socket_path, _RenderHandler)
+
+    def handle_request_payload(self, request):
+        if request.get("model") != self.model_id:
+            return {"error": f"daemon serves {self.model_id}", "model": self.model_id}
+        plans = request.get("plans") or []
+        if not plans:
+            return {"model": self.model_id, "images": []}
+        with self._render_lock:
+            images = self.render(plans)
+            self.images_rendered += len(images)
+        return {"model": self.model_id, "images": [_encode_image(i) for i in images]}
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class RenderClient:
+    """Connection to a running render daemon"""
+
+    def __init__(self, socket_path, model_id):
+        """
+        Connect and check that the daemon serves model_id
+
+        Raises:
+            OSError: No daemon is listening on socket_path
+            RuntimeError: The daemon serves a different model
+        """
+        self.model_id = model_id
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(socket_path)
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+        try:
+            self._call([])
+        except Exception:
+            self.close()
+            raise
+
+    def render(self, plans):
+        """
+        Render plans on the daemon
+
+        Args:
+            plans (list): Results of plan_image
+
+        Returns:
+            list: PIL images in the same order as plans
+        """
+        return [_decode_image(payload) for payload in self._call(plans)]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def _call(self, plans):
+        request = {"model": self.model_id, "plans": plans}
+        self._file.write((json.dumps(request) + "\n").encode())
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Render daemon closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Render daemon: {reply['error']}")
+        return reply["images"]
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Stage timers, counters and a JSON run report shared by the portfolio generators.
+
+Code wraps work in stage("name") and bumps counters with count("name"). Every
+duration is kept, so the report can give per-stage percentiles. One stage can
+optionally be profiled with cProfile (or pyinstrument, if installed).
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+import contextlib
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+REPORT_DIR = ".cache/reports"
+
+
+def percentile(sorted_values, fraction):
+    """Linearly interpolated percentile of an ascending list (fraction in 0..1)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class RunReport:
+    """Per-stage durations and named counters for one run"""
+
+    def __init__(self, name="run"):
+        """
+        Args:
+            name (str): Name of the program, used in the default report path
+        """
+        self.name = name
+        self.started = time.time()
+        self.info = {}
+        self._start = time.perf_counter()
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._profile_stage = None
+        self._profiler_name = None
+        self._profiler = None
+        self._profile_lock = threading.Lock()
+
+    def enable_profiling(self, stage, profiler="cprofile"):
+        """
+        Profile every run of a stage (one thread at a time)
+
+        Args:
+            stage (str): Stage name
+            profiler (str): "cprofile" or "pyinstrument"
+        """
+        if profiler == "pyinstrument" and pyinstrument is None:
+            print("pyinstrument is not installed; profiling with cProfile")
+            profiler = "cprofile"
+        self._profile_stage = stage
+        self._profiler_name = profiler
+        if profiler == "pyinstrument":
+            self._profiler = pyinstrument.Profiler()
+        else:
+            self._profiler = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one run of stage name"""
+        profiling = name == self._profile_stage and self._profile_lock.acquire(
+            blocking=False
+        )
+        if profiling:
+            if self._profiler_name == "pyinstrument":
+                self._profiler.start()
+            else:
+                self._profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                if self._profiler_name == "pyinstrument":
+                    self._profiler.stop()
+                else:
+                    self._profiler.disable()
+                self._profile_lock.release()
+            self.record(name, elapsed)
+
+    def record(self, name, seconds):
+        """Add one duration to a stage"""
+        with self._lock:
+            self._stages.setdefault(name, []).append(seconds)
+
+    def count(self, name, n=1):
+        """Increase a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def drain(self):
+        """
+        Return and clear the raw durations and counters
+
+        Used by worker processes to ship their measurements to the parent,
+        which folds them in with merge.
+        """
+        with self._lock:
+            data = {"stages": self._stages, "counters": self._counters}
+            self._stages = {}
+            self._counters = {}
+        return data
+
+    def merge(self, data):
+        """Add durations and counters returned by another process's drain"""
+        with self._lock:
+            for name, durations in data["stages"].items():
+                self._stages.setdefault(name, []).extend(durations)
+            for name, n in data["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + n
+
+    def summary(self):
+        """
+        Build the machine-readable report
+
+        Returns:
+            dict: Run metadata, per-stage statistics and counters
+        """
+        with self._lock:
+            stages = {name: sorted(d) for name, d in self._stages.items()}
+            counters = dict(self._counters)
+        return {
+            "name": self.name,
+            "started": self.started,
+            "wall_seconds": time.perf_counter() - self._start,
+            "argv": sys.argv,
+            "info": self.info,
+            "stages": {
+                name: {
+                    "count": len(d),
+                    "total": sum(d),
+                    "mean": sum(d) / len(d),
+                    "p50": percentile(d, 0.5),
+                    "p90": percentile(d, 0.9),
+                    "p99": percentile(d, 0.99),
+                    "max": d[-1],
+                }
+                for name, d in sorted(stages.items())
+            },
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def default_path(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        return os.path.join(REPORT_DIR, f"{self.name}-{stamp}.json")
+
+    def write(self, path=None):
+        """
+        Write the JSON report (and the profile of the profiled stage, if any)
+
+        Args:
+            path (str): Output file (default: .cache/reports/<name>-<time>.json)
+
+        Returns:
+            str: Path of the written report
+        """
+        path = path or self.default_path()
+        summary = self.summary()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if self._profiler is not None and self._profile_stage in summary["stages"]:
+            root = os.path.splitext(path)[0]
+            if self._profiler_name == "pyinstrument":
+                profile_path = f"{root}.{self._profile_stage}.html"
+                with open(profile_path, "w") as f:
+                    f.write(self._profiler.output_html())
+            else:
+                profile_path = f"{root}.{self._profile_stage}.prof"
+                pstats.Stats(self._profiler).dump_stats(profile_path)
+            summary["profile"] = {"stage": self._profile_stage, "path": profile_path}
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+        return path
+
+    def print_summary(self):
+        """Print a table of stage timings and the counters"""
+        summary = self.summary()
+        print(f"\nRun report ({summary['wall_seconds']:.1f}s wall):")
+        if summary["stages"]:
+            print(
+                f"  {'stage':<22} {'count':>6} {'total s':>9} "
+                f"{'p50 s':>8} {'p90 s':>8} {'p99 s':>8}"
+            )
+        for name, s in summary["stages"].items():
+            print(
+                f"  {name:<22} {s['count']:>6} {s['total']:>9.2f} "
+                f"{s['p50']:>8.3f} {s['p90']:>8.3f} {s['p99']:>8.3f}"
+            )
+        for name, n in summary["counters"].items():
+            print(f"  {name}: {n}")
+
+
+# Report of the current run, shared by every module of the process
+_report = RunReport()
+# Per-thread override set by use_report (e.g. a renderer running alongside)
+_thread_report = threading.local()
+
+
+def start_report(name):
+    """Start a fresh report for this process and return it"""
+    global _report
+    _report = RunReport(name)
+    return _report
+
+
+def get_report():
+    """Report of the calling thread: its use_report override, else the process's"""
+    return getattr(_thread_report, "report", None) or _report
+
+
+@contextlib.contextmanager
+def use_report(report):
+    """Record this thread's stage() and count() calls on report"""
+    previous = getattr(_thread_report, "report", None)
+    _thread_report.report = report
+    try:
+        yield report
+    finally:
+        _thread_report.report = previous
+
+
+def stage(name):
+    """Time the enclosed block as one run of stage name on the current report"""
+    return get_report().stage(name)
+
+
+def count(name, n=1):
+    """Increase a counter on the current report"""
+    get_report().count(name, n)